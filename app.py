@@ -7,12 +7,23 @@ for key in ["HTTP_PROXY", "HTTPS_PROXY", "http_proxy", "https_proxy", "ALL_PROXY
     os.environ.pop(key, None)
 os.environ["NO_PROXY"] = "*"
 
-from typing import Generator, Optional, Tuple, Any, Dict
+import html
+from pathlib import Path
+from typing import Generator, Iterable, List, Optional, Tuple, Any, Dict
+from urllib.parse import quote
 
 import gradio as gr
+import uvicorn
 
-from src.pipeline import PipelineConfig, run_job
+from src.api import create_api
+from src.job_store import SQLiteJobStore, follow_job
+from src.pipeline import JobUpdate, PipelineConfig, run_job, run_retranslation
+from src.workspace import Workspace
 
+# When JOB_STORE is set, jobs are queued for `python -m src.worker` processes
+# instead of running inside the web server.
+JOB_STORE = os.environ.get("JOB_STORE")
+JOB_SHARED_DIR = os.environ.get("JOB_SHARED_DIR", "runs")
 
 
 CUSTOM_CSS = """
@@ -26,17 +37,48 @@ video::cue {
 }
 """
 
+# Adds any missing or changed <track> elements to the preview player and
+# shows the selected one. Track switching never reloads the video itself.
+SYNC_TRACKS_JS = """
+(tracks, selected) => {
+    const video = document.querySelector('#subtitle-preview video');
+    if (!video || !tracks) return;
+    for (const [label, src] of Object.entries(tracks)) {
+        if (!src) continue;
+        let el = Array.from(video.querySelectorAll('track')).find(t => t.label === label);
+        if (el && el.getAttribute('src') === src) continue;
+        if (el) el.remove();
+        el = document.createElement('track');
+        el.kind = 'subtitles';
+        el.label = label;
+        el.src = src;
+        video.appendChild(el);
+    }
+    const shown = tracks[selected] ? selected : 'Original';
+    for (const track of video.textTracks) {
+        track.mode = track.label === shown ? 'showing' : 'disabled';
+    }
+}
+"""
+
+
+def _file_url(path: str) -> str:
+    """URL for a workspace file served by Gradio, versioned by modification time."""
+    resolved = Path(path).resolve()
+    return f"/gradio_api/file={quote(str(resolved))}?v={int(resolved.stat().st_mtime)}"
+
+
+def _player_html(video_path: str) -> str:
+    return (
+        '<video controls preload="metadata" style="width: 100%; max-height: 70vh;" '
+        f'src="{html.escape(_file_url(video_path))}"></video>'
+    )
+
+
 def build_demo() -> gr.Blocks:
     with gr.Blocks(title="Whisper Subtitle Generator") as demo:
         gr.Markdown("# Whisper Subtitle Generator")
 
-        # State to store paths of generated subtitles
-        subtitle_paths = gr.State(value={
-            "Original": None,
-            "Translated": None,
-            "Bilingual": None
-        })
-
         with gr.Row():
             url = gr.Textbox(label="Video URL (YouTube or other supported platforms)", placeholder="https://...")
             local_video = gr.File(label="Local Video File", file_types=["video"], type="filepath")
@@ -88,14 +130,15 @@ def build_demo() -> gr.Blocks:
                 (pos) => {
                     const videos = document.querySelectorAll('video');
                     videos.forEach(video => {
-                        if (!video.textTracks || video.textTracks.length === 0) return;
-                        const track = video.textTracks[0];
-                        const cues = track.cues;
-                        if (!cues) return;
-                        
-                        for (let i = 0; i < cues.length; i++) {
-                            cues[i].snapToLines = false;
-                            cues[i].line = pos; 
+                        if (!video.textTracks) return;
+                        for (const track of video.textTracks) {
+                            const cues = track.cues;
+                            if (!cues) continue;
+                            
+                            for (let i = 0; i < cues.length; i++) {
+                                cues[i].snapToLines = false;
+                                cues[i].line = pos; 
+                            }
                         }
                     });
                 }
@@ -109,6 +152,10 @@ def build_demo() -> gr.Blocks:
                 value="medium",
             )
             device = gr.Dropdown(label="Device", choices=["cuda", "cpu"], value="cuda")
+            preview_proxy = gr.Checkbox(
+                label="Low-bitrate preview (transcoded in the background for remote reviewers)",
+                value=False,
+            )
 
             deepseek_base_url = gr.Textbox(
                 label="DEEPSEEK_BASE_URL (optional override)",
@@ -127,57 +174,65 @@ def build_demo() -> gr.Blocks:
                 value="",
             )
             deepseek_model = gr.Textbox(label="DeepSeek model", value="deepseek-chat")
-            translation_target = gr.Dropdown(label="Translate to", choices=["zh"], value="zh")
+            translation_target = gr.Dropdown(
+                label="Translate to",
+                choices=["zh", "en", "ja", "ko", "fr", "de", "es", "ru"],
+                value=["zh"],
+                multiselect=True,
+            )
+            glossary = gr.Textbox(
+                label="Glossary (optional)",
+                placeholder="One term per line, e.g. Whisper = Whisper",
+                lines=3,
+                value="",
+            )
 
         run_btn = gr.Button("Run", variant="primary")
 
         status = gr.Markdown(label="Status")
-        preview = gr.Video(label="Preview", include_audio=True)
+        preview = gr.HTML(elem_id="subtitle-preview")
+        # Subtitle track label -> VTT URL, synced into the player on the client
+        preview_tracks = gr.JSON(value={}, visible=False)
 
         with gr.Row():
-            out_srt = gr.File(label="Output SRT (Bilingual)", type="filepath")
-            out_vtt = gr.File(label="Output VTT (Bilingual)", type="filepath")
+            out_srt = gr.File(label="Output SRT (Bilingual)", type="filepath", file_count="multiple")
+            out_vtt = gr.File(label="Output VTT (Bilingual)", type="filepath", file_count="multiple")
 
         workspace_dir = gr.Textbox(label="Workspace Directory", interactive=False)
+        metrics = gr.JSON(label="Job Metrics")
 
-        def _update_video_subtitles(track: str, paths: Dict[str, Optional[str]], current_video: Any):
-            """Update the video component with the selected subtitle track."""
-            if not current_video:
-                return None
-            
-            # current_video might be a dict or a string path depending on Gradio version/state
-            # But gr.Video output expects a Video object or path.
-            # If we just want to update subtitles, we return a new gr.Video update.
-            
-            video_path = current_video
-            if isinstance(current_video, dict):
-                video_path = current_video.get("video") or current_video.get("name")
-
-            vtt_path = paths.get(track)
-            
-            return gr.Video(value=video_path, subtitles=vtt_path)
+        with gr.Accordion("Re-translate Edited Subtitles", open=False):
+            gr.Markdown("Upload the corrected original track of the job above. Only changed lines are re-translated.")
+            edited_subtitles = gr.File(
+                label="Edited Original Subtitles (SRT or VTT)", file_types=[".srt", ".vtt"], type="filepath"
+            )
+            retranslate_btn = gr.Button("Re-translate Changes")
 
-        subtitle_track.change(
-            fn=_update_video_subtitles,
-            inputs=[subtitle_track, subtitle_paths, preview],
-            outputs=preview
-        )
+        subtitle_track.change(fn=None, inputs=[preview_tracks, subtitle_track], js=SYNC_TRACKS_JS)
+        preview_tracks.change(fn=None, inputs=[preview_tracks, subtitle_track], js=SYNC_TRACKS_JS)
+        preview.change(fn=None, inputs=[preview_tracks, subtitle_track], js=SYNC_TRACKS_JS)
 
-        def _run(
+        def _config_from_inputs(
             url_value: str,
             local_video_value: Optional[str],
             transcription_language_value: str,
-            track_value: str, # Current subtitle track selection
             model_size_value: str,
             device_value: str,
             deepseek_base_url_value: str,
             proxy_value: str,
             deepseek_api_key_value: str,
             deepseek_model_value: str,
-            translation_target_value: str,
-        ) -> Generator[Tuple[str, Any, Optional[str], Optional[str], str, Dict[str, Optional[str]]], None, None]:
+            translation_target_value: List[str],
+            glossary_value: str,
+            preview_proxy_value: bool,
+        ) -> PipelineConfig:
             compute_type_value = "int8" if device_value == "cpu" else "float16"
-            cfg = PipelineConfig(
+            glossary_entries = {}
+            for line in (glossary_value or "").splitlines():
+                term, sep, translation = line.partition("=")
+                if sep and term.strip() and translation.strip():
+                    glossary_entries[term.strip()] = translation.strip()
+            return PipelineConfig(
                 url=(url_value or None),
                 local_video_path=local_video_value,
                 transcription_language=transcription_language_value,
@@ -189,63 +244,118 @@ def build_demo() -> gr.Blocks:
                 deepseek_model=deepseek_model_value,
                 translation_target=translation_target_value,
                 proxy=(proxy_value or None),
+                glossary=(glossary_entries or None),
+                preview_proxy=bool(preview_proxy_value),
             )
 
-            current_paths = {
-                "Original": None,
-                "Translated": None,
-                "Bilingual": None
-            }
-
-            for update in run_job(cfg):
-                # Update paths state
-                if update.original_vtt_path: current_paths["Original"] = update.original_vtt_path
-                if update.translated_vtt_path: current_paths["Translated"] = update.translated_vtt_path
-                if update.bilingual_vtt_path: current_paths["Bilingual"] = update.bilingual_vtt_path
-
-                # Determine which subtitle to show based on current track selection
-                selected_vtt = current_paths.get(track_value)
-                
-                # If selected track is not ready yet, fallback to available ones in order of preference
-                if not selected_vtt:
-                     if current_paths["Original"]: selected_vtt = current_paths["Original"]
-
-                # Construct Video component update
-                video_update = gr.Video(
-                    value=update.video_path,
-                    subtitles=selected_vtt
-                ) if update.video_path else None
+        def _stream_updates(
+            updates: Iterable[JobUpdate],
+        ) -> Generator[Tuple[str, Any, List[str], List[str], str, Dict[str, str], Dict[str, float]], None, None]:
+            shown_video = None
+
+            for update in updates:
+                tracks: Dict[str, str] = {}
+                if update.original_vtt_path: tracks["Original"] = _file_url(update.original_vtt_path)
+                if update.translated_vtt_path: tracks["Translated"] = _file_url(update.translated_vtt_path)
+                if update.bilingual_vtt_path: tracks["Bilingual"] = _file_url(update.bilingual_vtt_path)
+
+                # Only re-render the player when its source changes (the preview
+                # proxy replaces the full-size video once it is encoded); new
+                # subtitle tracks are attached on the client.
+                video_path = update.preview_path or update.video_path
+                if video_path and video_path != shown_video:
+                    shown_video = video_path
+                    player_update = _player_html(video_path)
+                else:
+                    player_update = gr.update()
 
+                # Default outputs to bilingual, one file per target language
+                bilingual = update.translations.values()
                 yield (
                     update.status_markdown,
-                    video_update,
-                    update.bilingual_srt_path, # Default outputs to bilingual
-                    update.bilingual_vtt_path,
+                    player_update,
+                    [paths["bilingual_srt"] for paths in bilingual],
+                    [paths["bilingual_vtt"] for paths in bilingual],
                     update.workspace_dir,
-                    current_paths
+                    tracks,
+                    update.metrics,
                 )
 
+        def _run(
+            url_value: str,
+            local_video_value: Optional[str],
+            transcription_language_value: str,
+            *settings: Any,
+        ):
+            cfg = _config_from_inputs(url_value, local_video_value, transcription_language_value, *settings)
+
+            if JOB_STORE:
+                store = SQLiteJobStore(JOB_STORE, shared_dir=JOB_SHARED_DIR)
+                updates = follow_job(store, store.submit(cfg))
+            else:
+                updates = run_job(cfg)
+
+            yield from _stream_updates(updates)
+
+        def _retranslate(
+            workspace_dir_value: str,
+            edited_subtitles_value: Optional[str],
+            transcription_language_value: str,
+            *settings: Any,
+        ):
+            if not workspace_dir_value:
+                raise gr.Error("Run a job first; re-translation updates that job's workspace")
+            if not edited_subtitles_value:
+                raise gr.Error("Upload the edited original SRT or VTT file")
+
+            cfg = _config_from_inputs(None, None, transcription_language_value, *settings)
+            workspace = Workspace(root=Path(workspace_dir_value))
+            yield from _stream_updates(run_retranslation(cfg, workspace, edited_subtitles_value))
+
+        settings_inputs = [
+            model_size,
+            device,
+            deepseek_base_url,
+            proxy,
+            deepseek_api_key,
+            deepseek_model,
+            translation_target,
+            glossary,
+            preview_proxy,
+        ]
+        job_outputs = [status, preview, out_srt, out_vtt, workspace_dir, preview_tracks, metrics]
+
+        retranslate_btn.click(
+            _retranslate,
+            inputs=[workspace_dir, edited_subtitles, transcription_language, *settings_inputs],
+            outputs=job_outputs,
+        )
+
         run_btn.click(
             _run,
-            inputs=[
-                url,
-                local_video,
-                transcription_language,
-                subtitle_track,
-                model_size,
-                device,
-                deepseek_base_url,
-                proxy,
-                deepseek_api_key,
-                deepseek_model,
-                translation_target,
-            ],
-            outputs=[status, preview, out_srt, out_vtt, workspace_dir, subtitle_paths],
+            inputs=[url, local_video, transcription_language, *settings_inputs],
+            outputs=job_outputs,
         )
 
     return demo
 
 
+def build_app():
+    """Serve the JSON job API under /api and the Gradio UI at / on one ASGI app."""
+    store = SQLiteJobStore(JOB_STORE, shared_dir=JOB_SHARED_DIR) if JOB_STORE else None
+    app = create_api(store=store)
+    return gr.mount_gradio_app(
+        app,
+        build_demo(),
+        path="/",
+        allowed_paths=[os.path.abspath("runs"), os.path.abspath(JOB_SHARED_DIR)],
+        css=CUSTOM_CSS,
+    )
+
+
 if __name__ == "__main__":
-    demo = build_demo()
-    demo.launch(allowed_paths=[os.path.abspath("runs")], css=CUSTOM_CSS)
+    uvicorn.run(
+        build_app(),
+        host=os.environ.get("APP_HOST", "127.0.0.1"),
+        port=int(os.environ.get("APP_PORT", "7860")),
+    )
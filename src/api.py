@@ -0,0 +1,324 @@
+import asyncio
+import collections.abc
+import json
+import os
+from contextlib import asynccontextmanager
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+
+from src.deepseek_client import DEFAULT_DEEPSEEK_BASE_URL
+from src.job_store import JobRecord, JobStore, job_settled
+from src.jobs import Job, JobManager
+from src.pipeline import JobUpdate, PipelineConfig, validate_config
+from src.workspace import Workspace
+
+SSE_KEEPALIVE_SECONDS = 15
+# How often event streams poll a shared job store for new updates
+STORE_POLL_SECONDS = 1.0
+
+
+def _matches_type(value: Any, hint: Any) -> bool:
+    origin = get_origin(hint)
+    if origin is Union:
+        return any(_matches_type(value, arg) for arg in get_args(hint))
+    if hint is type(None):
+        return value is None
+    if origin is collections.abc.Sequence:
+        return isinstance(value, list) and all(_matches_type(item, get_args(hint)[0]) for item in value)
+    if origin is dict:
+        key_type, value_type = get_args(hint)
+        return isinstance(value, dict) and all(
+            _matches_type(k, key_type) and _matches_type(v, value_type) for k, v in value.items()
+        )
+    return isinstance(value, hint)
+
+
+def _check_local_media(local_video_path: str) -> None:
+    # API callers must not be able to have the server copy, and then serve,
+    # arbitrary files it can read.
+    media_dir = os.environ.get("API_MEDIA_DIR")
+    if not media_dir:
+        raise ValueError("local_video_path is not accepted by the API unless API_MEDIA_DIR is set; submit a url")
+    root = Path(media_dir).resolve()
+    if root not in Path(local_video_path).resolve().parents:
+        raise ValueError("local_video_path must be inside API_MEDIA_DIR")
+
+
+def config_from_payload(payload: Dict[str, Any]) -> PipelineConfig:
+    """Build a PipelineConfig from a JSON payload, applying the UI's defaults."""
+    if not isinstance(payload, dict):
+        raise ValueError("Payload must be a JSON object")
+
+    known = {f.name for f in fields(PipelineConfig)}
+    unknown = sorted(set(payload) - known)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    given = {k: v for k, v in payload.items() if v not in (None, "")}
+    hints = get_type_hints(PipelineConfig)
+    mistyped = sorted(name for name, value in given.items() if not _matches_type(value, hints[name]))
+    if mistyped:
+        raise ValueError(f"Invalid value type for: {', '.join(mistyped)}")
+    if "local_video_path" in given:
+        _check_local_media(given["local_video_path"])
+
+    device = given.get("device", "cuda")
+    values: Dict[str, Any] = {
+        "url": None,
+        "local_video_path": None,
+        "transcription_language": "auto",
+        "model_size": "medium",
+        "device": device,
+        "compute_type": "int8" if device == "cpu" else "float16",
+        "deepseek_api_key": "",
+        "deepseek_base_url": os.environ.get("DEEPSEEK_BASE_URL", DEFAULT_DEEPSEEK_BASE_URL),
+        "deepseek_model": "deepseek-chat",
+        "translation_target": "zh",
+        "proxy": None,
+    }
+    values.update(given)
+    if "deepseek_base_url" not in given:
+        # The server's key only ever goes to the server's endpoint, never to
+        # a base URL chosen by the caller.
+        values["deepseek_api_key"] = given.get("deepseek_api_key", os.environ.get("DEEPSEEK_API_KEY", ""))
+
+    cfg = PipelineConfig(**values)
+    validate_config(cfg)
+    return cfg
+
+
+def _job_or_404(manager: JobManager, job_id: str) -> Job:
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+async def _record_or_404(store: JobStore, job_id: str) -> JobRecord:
+    record = await run_in_threadpool(store.get, job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return record
+
+
+async def _submit_config(request: Request) -> PipelineConfig:
+    try:
+        return config_from_payload(await request.json())
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+def _artifact_paths(latest: Optional[JobUpdate], cfg: PipelineConfig) -> Dict[str, Path]:
+    if latest is None:
+        return {}
+    workspace = Workspace(root=Path(latest.workspace_dir))
+    return {name: path for name, path in workspace.subtitle_paths(cfg.translation_targets).items() if path.exists()}
+
+
+def _artifact_response(latest: Optional[JobUpdate], cfg: PipelineConfig, name: str) -> FileResponse:
+    if latest is None:
+        raise HTTPException(status_code=404, detail="Job has not started yet")
+    path = _artifact_paths(latest, cfg).get(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Artifact not available: {name}")
+    return FileResponse(path, filename=name)
+
+
+def _event_stream(stream: AsyncGenerator[str, None]) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def build_router(manager: JobManager) -> APIRouter:
+    router = APIRouter(prefix="/api")
+
+    @router.post("/jobs", status_code=202)
+    async def submit_job(request: Request) -> Dict[str, Any]:
+        cfg = await _submit_config(request)
+        return manager.submit(cfg).to_dict()
+
+    @router.get("/jobs")
+    async def list_jobs() -> Dict[str, Any]:
+        return {"jobs": [job.to_dict() for job in manager.list()]}
+
+    @router.get("/jobs/{job_id}")
+    async def get_job(job_id: str) -> Dict[str, Any]:
+        return _job_or_404(manager, job_id).to_dict()
+
+    @router.post("/jobs/{job_id}/cancel")
+    async def cancel_job(job_id: str) -> Dict[str, Any]:
+        _job_or_404(manager, job_id)
+        return manager.cancel(job_id).to_dict()
+
+    @router.get("/jobs/{job_id}/events")
+    async def job_events(job_id: str, request: Request) -> StreamingResponse:
+        job = _job_or_404(manager, job_id)
+
+        # Resume after the last event the client saw, if it reconnects
+        try:
+            seen = int(request.headers.get("last-event-id", "-1")) + 1
+        except ValueError:
+            seen = 0
+
+        async def stream() -> AsyncGenerator[str, None]:
+            nonlocal seen
+            while True:
+                while seen < len(job.updates):
+                    yield _sse("update", asdict(job.updates[seen]), event_id=seen)
+                    seen += 1
+                if job.finished:
+                    yield _sse("end", job.to_dict())
+                    return
+                if await request.is_disconnected():
+                    return
+                try:
+                    await asyncio.wait_for(job.wait_for_change(seen), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+
+        return _event_stream(stream())
+
+    @router.get("/jobs/{job_id}/artifacts")
+    async def list_artifacts(job_id: str) -> Dict[str, Any]:
+        job = _job_or_404(manager, job_id)
+        return {"artifacts": list(_artifact_paths(job.latest, job.config))}
+
+    @router.get("/jobs/{job_id}/artifacts/{name}")
+    async def get_artifact(job_id: str, name: str) -> FileResponse:
+        job = _job_or_404(manager, job_id)
+        return _artifact_response(job.latest, job.config, name)
+
+    return router
+
+
+def build_store_router(store: JobStore) -> APIRouter:
+    """The same routes as `build_router`, backed by a shared job store.
+
+    Jobs are queued for `python -m src.worker` processes. The store keeps only
+    each job's latest update, so event streams poll it and send that update
+    whenever it changes; a reconnecting client gets the current update again.
+    A stream stays open after the job finishes until its preview task is done.
+    """
+    router = APIRouter(prefix="/api")
+
+    @router.post("/jobs", status_code=202)
+    async def submit_job(request: Request) -> Dict[str, Any]:
+        cfg = await _submit_config(request)
+        try:
+            job_id = await run_in_threadpool(store.submit, cfg)
+        except (ValueError, OSError) as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        return (await _record_or_404(store, job_id)).to_dict()
+
+    @router.get("/jobs")
+    async def list_jobs() -> Dict[str, Any]:
+        records: List[JobRecord] = await run_in_threadpool(store.list)
+        return {"jobs": [record.to_dict() for record in records]}
+
+    @router.get("/jobs/{job_id}")
+    async def get_job(job_id: str) -> Dict[str, Any]:
+        return (await _record_or_404(store, job_id)).to_dict()
+
+    @router.post("/jobs/{job_id}/cancel")
+    async def cancel_job(job_id: str) -> Dict[str, Any]:
+        await _record_or_404(store, job_id)
+        await run_in_threadpool(store.cancel, job_id)
+        return (await _record_or_404(store, job_id)).to_dict()
+
+    @router.get("/jobs/{job_id}/events")
+    async def job_events(job_id: str, request: Request) -> StreamingResponse:
+        await _record_or_404(store, job_id)
+
+        try:
+            event_id = int(request.headers.get("last-event-id", "-1")) + 1
+        except ValueError:
+            event_id = 0
+
+        async def stream() -> AsyncGenerator[str, None]:
+            nonlocal event_id
+            last: Optional[JobUpdate] = None
+            idle = 0.0
+            while True:
+                record = await run_in_threadpool(store.get, job_id)
+                if record is None:
+                    return
+                if record.update is not None and record.update != last:
+                    last = record.update
+                    yield _sse("update", asdict(last), event_id=event_id)
+                    event_id += 1
+                    idle = 0.0
+                if await run_in_threadpool(job_settled, store, record):
+                    yield _sse("end", record.to_dict())
+                    return
+                if await request.is_disconnected():
+                    return
+                await asyncio.sleep(STORE_POLL_SECONDS)
+                idle += STORE_POLL_SECONDS
+                if idle >= SSE_KEEPALIVE_SECONDS:
+                    yield ": keepalive\n\n"
+                    idle = 0.0
+
+        return _event_stream(stream())
+
+    @router.get("/jobs/{job_id}/artifacts")
+    async def list_artifacts(job_id: str) -> Dict[str, Any]:
+        record = await _record_or_404(store, job_id)
+        return {"artifacts": list(_artifact_paths(record.update, record.config))}
+
+    @router.get("/jobs/{job_id}/artifacts/{name}")
+    async def get_artifact(job_id: str, name: str) -> FileResponse:
+        record = await _record_or_404(store, job_id)
+        return _artifact_response(record.update, record.config, name)
+
+    return router
+
+
+def create_api(manager: Optional[JobManager] = None, store: Optional[JobStore] = None) -> FastAPI:
+    """Build the JSON API.
+
+    With a `store`, jobs are queued for workers; otherwise they run in-process
+    on `manager` (a default JobManager if not given).
+    """
+    if store is not None:
+        app = FastAPI(title="Whisper Subtitle Generator API")
+        app.include_router(build_store_router(store))
+        return app
+
+    job_manager = manager or JobManager()
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        yield
+        job_manager.shutdown()
+
+    app = FastAPI(title="Whisper Subtitle Generator API", lifespan=lifespan)
+    app.include_router(build_router(job_manager))
+    return app
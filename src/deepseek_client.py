@@ -1,11 +1,125 @@
 import json
 import re
+import threading
 import time
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
 
 import requests
 
+# Everything before the per-request content is identical across a job's
+# requests, so the provider's prefix cache can serve it. Keep per-request
+# data (context, items) at the end of the prompt.
+SYSTEM_PROMPT = (
+    "You are a professional subtitle translator. Return only strict JSON.\n\n"
+    "Translate each item of the input JSON array to the target language. "
+    "Return a JSON array of strings with the same length and order as the input.\n"
+    "If a glossary is given, use its translations for those terms.\n"
+    "If previous lines are given, use them only as context for consistent wording; do not translate or return them."
+)
+
+# Previous (source, translation) pairs sent with each batch for consistent wording
+CONTEXT_LINES = 3
+
+# DeepSeek list prices in USD per million tokens, by model, used for cost
+# estimates. Other models and other endpoints get no estimate.
+PRICE_PER_MILLION: Dict[str, Dict[str, float]] = {
+    "deepseek-chat": {"cache_hit": 0.028, "cache_miss": 0.28, "output": 0.42},
+    "deepseek-reasoner": {"cache_hit": 0.028, "cache_miss": 0.28, "output": 0.42},
+}
+DEEPSEEK_API_HOST = "api.deepseek.com"
+DEFAULT_DEEPSEEK_BASE_URL = f"https://{DEEPSEEK_API_HOST}"
+
+
+def prices_for(base_url: str, model: str) -> Optional[Dict[str, float]]:
+    """List prices for `model`, or None if they are unknown for this endpoint."""
+    if urlparse(base_url).hostname != DEEPSEEK_API_HOST:
+        return None
+    return PRICE_PER_MILLION.get(model)
+
+
+def build_translation_messages(
+    texts: Sequence[str],
+    target_language: str,
+    glossary: Optional[Dict[str, str]] = None,
+    context: Optional[Sequence[Tuple[str, str]]] = None,
+) -> List[Dict[str, str]]:
+    """Build chat messages ordered from most to least stable content.
+
+    Order: fixed system prompt, target language, glossary, previous context,
+    then the items to translate.
+    """
+    parts = [f"Target language: {target_language}"]
+    if glossary:
+        parts.append("Glossary:\n" + json.dumps(dict(sorted(glossary.items())), ensure_ascii=False))
+    if context:
+        previous = [{"source": src, "translation": dst} for src, dst in context]
+        parts.append("Previous lines:\n" + json.dumps(previous, ensure_ascii=False))
+    parts.append("Input JSON:\n" + json.dumps(list(texts), ensure_ascii=False))
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": "\n\n".join(parts)},
+    ]
+
+
+class UsageStats:
+    """Thread-safe totals of token usage and latency across API requests."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hit_tokens = 0
+        self.cache_miss_tokens = 0
+        self.latency_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, usage: Optional[Dict[str, Any]], latency_seconds: float) -> None:
+        usage = usage or {}
+        prompt_tokens = int(usage.get("prompt_tokens", 0))
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += int(usage.get("completion_tokens", 0))
+            self.cache_hit_tokens += int(usage.get("prompt_cache_hit_tokens", 0))
+            self.cache_miss_tokens += int(usage.get("prompt_cache_miss_tokens", prompt_tokens))
+            self.latency_seconds += latency_seconds
+
+    @classmethod
+    def combine(cls, stats: Iterable["UsageStats"]) -> "UsageStats":
+        total = cls()
+        for s in stats:
+            total.requests += s.requests
+            total.prompt_tokens += s.prompt_tokens
+            total.completion_tokens += s.completion_tokens
+            total.cache_hit_tokens += s.cache_hit_tokens
+            total.cache_miss_tokens += s.cache_miss_tokens
+            total.latency_seconds += s.latency_seconds
+        return total
+
+    def as_metrics(self, prefix: str, prices: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Usage totals as metrics, plus an estimated cost if `prices` are given."""
+        prompt = self.cache_hit_tokens + self.cache_miss_tokens
+        metrics = {
+            f"{prefix}requests": float(self.requests),
+            f"{prefix}prompt_tokens": float(self.prompt_tokens),
+            f"{prefix}completion_tokens": float(self.completion_tokens),
+            f"{prefix}cache_hit_tokens": float(self.cache_hit_tokens),
+            f"{prefix}cache_miss_tokens": float(self.cache_miss_tokens),
+            f"{prefix}cache_hit_ratio": round(self.cache_hit_tokens / prompt, 3) if prompt else 0.0,
+            f"{prefix}latency_seconds": round(self.latency_seconds, 3),
+        }
+        if prices is not None:
+            cost = (
+                self.cache_hit_tokens * prices["cache_hit"]
+                + self.cache_miss_tokens * prices["cache_miss"]
+                + self.completion_tokens * prices["output"]
+            ) / 1_000_000
+            metrics[f"{prefix}estimated_cost_usd"] = round(cost, 6)
+        return metrics
+
 
 @dataclass(frozen=True)
 class DeepSeekClient:
@@ -13,25 +127,40 @@ class DeepSeekClient:
     api_key: str
     model: str
     proxy: str = ""
-
-    def translate_batch(self, texts: List[str], target_language: str) -> List[str]:
+    glossary: Optional[Dict[str, str]] = field(default=None, compare=False)
+    stats: Optional[UsageStats] = field(default=None, compare=False)
+
+    def translate_batch(
+        self,
+        texts: List[str],
+        target_language: str,
+        context: Optional[Sequence[Tuple[str, str]]] = None,
+    ) -> List[str]:
         if not texts:
             return []
 
         try:
-            return self._translate_chunk_with_retries(texts, target_language)
+            return self._translate_chunk_with_retries(texts, target_language, context)
         except ValueError as e:
             if len(texts) > 1:
                 mid = len(texts) // 2
                 left = texts[:mid]
                 right = texts[mid:]
                 print(f"[DeepSeekClient] Batch failed: {e}. Splitting {len(texts)} -> {len(left)} + {len(right)}...")
-                return self.translate_batch(left, target_language) + self.translate_batch(right, target_language)
+                left_out = self.translate_batch(left, target_language, context)
+                # The right half follows the left half, so the left half's tail is its context
+                right_context = (list(context or []) + list(zip(left, left_out)))[-CONTEXT_LINES:]
+                return left_out + self.translate_batch(right, target_language, right_context)
             else:
                 print(f"[DeepSeekClient] Single item failed: {e}. Returning original.")
                 return texts
 
-    def _translate_chunk_with_retries(self, texts: List[str], target_language: str) -> List[str]:
+    def _translate_chunk_with_retries(
+        self,
+        texts: List[str],
+        target_language: str,
+        context: Optional[Sequence[Tuple[str, str]]] = None,
+    ) -> List[str]:
         if not self.base_url:
             raise ValueError("DEEPSEEK_BASE_URL is required")
         if not self.api_key:
@@ -50,21 +179,7 @@ class DeepSeekClient:
             try:
                 payload = {
                     "model": self.model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a professional subtitle translator. Return only strict JSON.",
-                        },
-                        {
-                            "role": "user",
-                            "content": (
-                                "Translate each item to the target language. "
-                                "Return a JSON array of strings with the same length and order as the input.\n\n"
-                                f"Target language: {target_language}\n\n"
-                                "Input JSON:\n" + json.dumps(texts, ensure_ascii=False)
-                            ),
-                        },
-                    ],
+                    "messages": build_translation_messages(texts, target_language, self.glossary, context),
                     "temperature": 0.2,
                 }
 
@@ -73,9 +188,12 @@ class DeepSeekClient:
                     "Content-Type": "application/json",
                 }
 
+                started = time.perf_counter()
                 resp = requests.post(url, headers=headers, json=payload, timeout=120, proxies=proxies)
                 resp.raise_for_status()
                 data = resp.json()
+                if self.stats is not None:
+                    self.stats.record(data.get("usage"), time.perf_counter() - started)
                 
                 try:
                     content = data["choices"][0]["message"]["content"]
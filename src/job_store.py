@@ -0,0 +1,425 @@
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Generator, Iterator, List, Optional, Protocol, Sequence
+
+from src.pipeline import PREVIEW_STAGE, STAGES, JobUpdate, PipelineConfig, validate_config
+from src.workspace import create_workspace, ensure_local_media
+
+
+@dataclass(frozen=True)
+class JobRecord:
+    job_id: str
+    config: PipelineConfig
+    workspace_dir: str
+    stage: str
+    # queued, leased, succeeded, failed, cancelled
+    state: str
+    attempts: int
+    lease_owner: Optional[str]
+    lease_expires: float
+    cancel_requested: bool
+    error: Optional[str]
+    update: Optional[JobUpdate]
+    # Set on background tasks (the preview proxy) spawned by a job
+    parent_id: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("succeeded", "failed", "cancelled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "stage": self.stage,
+            "error": self.error,
+            "latest": asdict(self.update) if self.update else None,
+        }
+
+
+class JobStore(Protocol):
+    """What the front end and the workers need from a shared job queue."""
+
+    def submit(self, cfg: PipelineConfig) -> str:
+        """Queue a job at its first stage and return its id."""
+        ...
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        ...
+
+    def list(self, limit: int = 100) -> List[JobRecord]:
+        """The most recently submitted jobs, newest first."""
+        ...
+
+    def tasks(self, job_id: str) -> List[JobRecord]:
+        """The background tasks (the preview proxy) spawned by a job."""
+        ...
+
+    def lease(self, worker_id: str, stages: Sequence[str], lease_seconds: float) -> Optional[JobRecord]:
+        """Claim the next runnable job whose current stage is in `stages`."""
+        ...
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend a lease. Returns False once the worker no longer holds it."""
+        ...
+
+    def publish(self, job_id: str, worker_id: str, update: JobUpdate) -> None:
+        ...
+
+    def complete_stage(self, job_id: str, worker_id: str, update: JobUpdate) -> None:
+        """Advance the job past its current stage; ignored unless `worker_id` holds the lease."""
+        ...
+
+    def release(self, job_id: str, worker_id: str) -> None:
+        """Give up a lease without finishing the stage."""
+        ...
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        ...
+
+    def cancel(self, job_id: str) -> None:
+        ...
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    config TEXT NOT NULL,
+    workspace_dir TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    update_json TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    parent_id TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (state, stage, created_at);
+"""
+
+
+class SQLiteJobStore:
+    """Job queue shared by the front end and the stage workers.
+
+    Workers lease one stage of a job at a time and must heartbeat to keep the
+    lease. A lease that expires (crashed or stalled worker) makes the stage
+    available to any other worker, up to `max_attempts` leases per stage.
+
+    SQLite is enough for a single host or a reliable shared filesystem; any
+    other JobStore implementation can be dropped in for larger clusters.
+    """
+
+    def __init__(self, db_path: str, shared_dir: str = "runs", max_attempts: int = 3) -> None:
+        self.db_path = db_path
+        self.shared_dir = shared_dir
+        self.max_attempts = max_attempts
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "parent_id" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN parent_id TEXT")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One connection per operation keeps the store safe to use from
+        # heartbeat threads and separate processes alike.
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> JobRecord:
+        update = json.loads(row["update_json"]) if row["update_json"] else None
+        return JobRecord(
+            job_id=row["job_id"],
+            config=PipelineConfig(**json.loads(row["config"])),
+            workspace_dir=row["workspace_dir"],
+            stage=row["stage"],
+            state=row["state"],
+            attempts=row["attempts"],
+            lease_owner=row["lease_owner"],
+            lease_expires=row["lease_expires"],
+            cancel_requested=bool(row["cancel_requested"]),
+            error=row["error"],
+            update=JobUpdate(**update) if update else None,
+            parent_id=row["parent_id"],
+        )
+
+    def submit(self, cfg: PipelineConfig) -> str:
+        validate_config(cfg)
+
+        workspace = create_workspace(self.shared_dir)
+        if not cfg.url:
+            # Uploads live on the submitting host; move them to shared storage
+            media = ensure_local_media(workspace, cfg.local_video_path or "")
+            cfg = replace(cfg, local_video_path=str(media))
+        # Never store the API key in the shared database; workers use their own
+        cfg = replace(cfg, deepseek_api_key="")
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        update = JobUpdate(
+            status_markdown="**Queued...**",
+            video_path=None,
+            original_vtt_path=None,
+            translated_vtt_path=None,
+            bilingual_vtt_path=None,
+            original_srt_path=None,
+            translated_srt_path=None,
+            bilingual_srt_path=None,
+            workspace_dir=str(workspace.root),
+        )
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, config, workspace_dir, stage, state, update_json, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(asdict(cfg)), str(workspace.root), STAGES[0], json.dumps(asdict(update)), now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_record(row) if row else None
+
+    def list(self, limit: int = 100) -> List[JobRecord]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE parent_id IS NULL ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def tasks(self, job_id: str) -> List[JobRecord]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs WHERE parent_id = ? ORDER BY created_at", (job_id,)).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    @staticmethod
+    def _with_preview(conn: sqlite3.Connection, job_id: str, update: JobUpdate) -> JobUpdate:
+        # A job's stages and its preview task finish in either order; keep the
+        # preview on the job's update once the task has produced it.
+        if update.preview_path is not None:
+            return update
+        row = conn.execute(
+            "SELECT update_json FROM jobs WHERE parent_id = ? AND stage = ? AND state = 'succeeded'",
+            (job_id, PREVIEW_STAGE),
+        ).fetchone()
+        if row is None:
+            return update
+        return replace(update, preview_path=json.loads(row["update_json"]).get("preview_path"))
+
+    def lease(self, worker_id: str, stages: Sequence[str], lease_seconds: float) -> Optional[JobRecord]:
+        """Claim the oldest runnable job whose current stage is in `stages`."""
+        now = time.time()
+        placeholders = ",".join("?" for _ in stages)
+        with self._transaction() as conn:
+            # A job cancelled while leased is finalised by its worker; if that
+            # worker died, finalise it here once the lease has expired.
+            conn.execute(
+                "UPDATE jobs SET state = 'cancelled', lease_owner = NULL, updated_at = ?"
+                " WHERE cancel_requested = 1 AND state = 'leased' AND lease_expires < ?",
+                (now, now),
+            )
+            row = conn.execute(
+                "SELECT job_id, attempts FROM jobs"
+                f" WHERE stage IN ({placeholders}) AND cancel_requested = 0"
+                " AND (state = 'queued' OR (state = 'leased' AND lease_expires < ?))"
+                " ORDER BY created_at LIMIT 1",
+                (*stages, now),
+            ).fetchone()
+            if row is None:
+                return None
+
+            if row["attempts"] >= self.max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET state = 'failed', lease_owner = NULL, error = ?, updated_at = ? WHERE job_id = ?",
+                    ("Stage lease expired too many times", now, row["job_id"]),
+                )
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET state = 'leased', lease_owner = ?, lease_expires = ?,"
+                " attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                (worker_id, now + lease_seconds, now, row["job_id"]),
+            )
+            leased = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+        return self._to_record(leased)
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend a lease. Returns False if the lease was lost or the job was cancelled."""
+        now = time.time()
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ?"
+                " WHERE job_id = ? AND lease_owner = ? AND state = 'leased' AND cancel_requested = 0",
+                (now + lease_seconds, now, job_id, worker_id),
+            )
+        return cur.rowcount == 1
+
+    def publish(self, job_id: str, worker_id: str, update: JobUpdate) -> None:
+        with self._transaction() as conn:
+            update = self._with_preview(conn, job_id, update)
+            conn.execute(
+                "UPDATE jobs SET update_json = ?, updated_at = ? WHERE job_id = ? AND lease_owner = ?",
+                (json.dumps(asdict(update)), time.time(), job_id, worker_id),
+            )
+
+    def complete_stage(self, job_id: str, worker_id: str, update: JobUpdate) -> None:
+        """Hand the job to the next stage, or mark it succeeded after the last one.
+
+        Finishing "download" also queues the preview proxy, when requested, as
+        a task of its own so it is leased and retried like any stage. When that
+        task succeeds its preview is copied onto the job's update.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ? AND lease_owner = ? AND state = 'leased'",
+                (job_id, worker_id),
+            ).fetchone()
+            if row is None:
+                return
+
+            if row["cancel_requested"]:
+                stage, state = row["stage"], "cancelled"
+            elif row["stage"] in STAGES[:-1]:
+                stage, state = STAGES[STAGES.index(row["stage"]) + 1], "queued"
+            else:
+                # The last stage, or a background task
+                stage, state = row["stage"], "succeeded"
+
+            update = self._with_preview(conn, job_id, update)
+            conn.execute(
+                "UPDATE jobs SET stage = ?, state = ?, attempts = 0, lease_owner = NULL, lease_expires = 0,"
+                " update_json = ?, updated_at = ? WHERE job_id = ?",
+                (stage, state, json.dumps(asdict(update)), now, job_id),
+            )
+
+            config = json.loads(row["config"])
+            if row["stage"] == STAGES[0] and state == "queued" and config.get("preview_proxy"):
+                conn.execute(
+                    "INSERT INTO jobs (job_id, config, workspace_dir, stage, state, update_json, created_at,"
+                    " updated_at, parent_id) VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                    (
+                        uuid.uuid4().hex,
+                        row["config"],
+                        row["workspace_dir"],
+                        PREVIEW_STAGE,
+                        json.dumps(asdict(update)),
+                        now,
+                        now,
+                        job_id,
+                    ),
+                )
+            elif row["parent_id"] and state == "succeeded" and update.preview_path:
+                parent = conn.execute(
+                    "SELECT update_json FROM jobs WHERE job_id = ?", (row["parent_id"],)
+                ).fetchone()
+                if parent is not None and parent["update_json"]:
+                    parent_update = {**json.loads(parent["update_json"]), "preview_path": update.preview_path}
+                    conn.execute(
+                        "UPDATE jobs SET update_json = ?, updated_at = ? WHERE job_id = ?",
+                        (json.dumps(parent_update), now, row["parent_id"]),
+                    )
+
+    def release(self, job_id: str, worker_id: str) -> None:
+        """Give up a lease without finishing the stage.
+
+        The stage is queued for another attempt, or the job is marked
+        cancelled if that is why the lease was lost.
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = CASE WHEN cancel_requested THEN 'cancelled' ELSE 'queued' END,"
+                " lease_owner = NULL, lease_expires = 0, updated_at = ?"
+                " WHERE job_id = ? AND lease_owner = ? AND state = 'leased'",
+                (time.time(), job_id, worker_id),
+            )
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = 'failed', lease_owner = NULL, error = ?, updated_at = ?"
+                " WHERE job_id = ? AND lease_owner = ?",
+                (error, time.time(), job_id, worker_id),
+            )
+
+    def cancel(self, job_id: str) -> None:
+        """Cancel a job and its background tasks.
+
+        A running stage is stopped by its worker at the next heartbeat.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ?"
+                " WHERE (job_id = ? OR parent_id = ?) AND state IN ('queued', 'leased')",
+                (now, job_id, job_id),
+            )
+            conn.execute(
+                "UPDATE jobs SET state = 'cancelled', lease_owner = NULL, updated_at = ?"
+                " WHERE (job_id = ? OR parent_id = ?)"
+                " AND (state = 'queued' OR (state = 'leased' AND lease_expires < ?))",
+                (now, job_id, job_id, now),
+            )
+
+
+def job_settled(store: JobStore, record: JobRecord) -> bool:
+    """Whether a job is finished and will get no further updates.
+
+    A job that succeeded still gets its preview from a background task, so it
+    is only settled once those tasks have finished too.
+    """
+    if not record.finished:
+        return False
+    if record.state != "succeeded":
+        return True
+    return all(task.finished for task in store.tasks(record.job_id))
+
+
+def follow_job(
+    store: JobStore,
+    job_id: str,
+    poll_interval: float = 1.0,
+) -> Generator[JobUpdate, None, None]:
+    """Yield a job's updates as workers publish them, until it is settled."""
+    last: Optional[JobUpdate] = None
+    while True:
+        record = store.get(job_id)
+        if record is None:
+            raise RuntimeError(f"Job disappeared from the store: {job_id}")
+
+        if record.update is not None and record.update != last:
+            last = record.update
+            yield last
+
+        if record.state == "failed":
+            raise RuntimeError(record.error or "Job failed")
+        if job_settled(store, record):
+            return
+
+        time.sleep(poll_interval)
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from src.pipeline import JobCancelled, JobUpdate, PipelineConfig, run_job
+
+
+class JobState(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATES = (JobState.SUCCEEDED, JobState.FAILED, JobState.CANCELLED)
+
+
+class Job:
+    """A pipeline run tracked by the JobManager.
+
+    Updates are produced on a worker thread and consumed by coroutines on the
+    event loop the job was submitted from.
+    """
+
+    def __init__(self, job_id: str, config: PipelineConfig, loop: asyncio.AbstractEventLoop) -> None:
+        self.id = job_id
+        self.config = config
+        self.state = JobState.QUEUED
+        self.error: Optional[str] = None
+        self.updates: List[JobUpdate] = []
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+        # time.monotonic() when the job reached a finished state
+        self.finished_at: Optional[float] = None
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    @property
+    def latest(self) -> Optional[JobUpdate]:
+        return self.updates[-1] if self.updates else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        latest = self.latest
+        return {
+            "job_id": self.id,
+            "state": self.state.value,
+            "error": self.error,
+            "update_count": len(self.updates),
+            "latest": asdict(latest) if latest else None,
+        }
+
+    async def wait_for_change(self, seen: int) -> None:
+        """Wait until more than `seen` updates exist or the job has finished."""
+        while len(self.updates) <= seen and not self.finished:
+            changed = self._changed
+            await changed.wait()
+
+    def _publish(self, update: Optional[JobUpdate] = None, state: Optional[JobState] = None) -> None:
+        # Called from the worker thread
+        if update is not None:
+            self.updates.append(update)
+        if state is not None:
+            self.state = state
+            if state in FINISHED_STATES:
+                self.finished_at = time.monotonic()
+        self._loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class JobManager:
+    """Runs pipeline jobs on a bounded thread pool.
+
+    Progress readers never hold a thread: they await `Job.wait_for_change`
+    on the event loop, so any number of streams can follow a job. Finished
+    jobs are forgotten `retention_seconds` after they finish; their
+    workspaces stay on disk.
+    """
+
+    def __init__(self, max_workers: int = 1, retention_seconds: float = 3600.0) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self.retention_seconds = retention_seconds
+
+    def submit(self, config: PipelineConfig) -> Job:
+        """Queue a job. Must be called from a running event loop."""
+        job = Job(uuid.uuid4().hex, config, asyncio.get_running_loop())
+        with self._lock:
+            self._evict_expired()
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._evict_expired()
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            self._evict_expired()
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation.
+
+        Queued jobs are dropped immediately; running jobs stop at the next
+        stage, transcribed segment or translation batch.
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job._publish(state=JobState.CANCELLED)
+        return job
+
+    def shutdown(self) -> None:
+        for job in self.list():
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _evict_expired(self) -> None:
+        # Caller holds self._lock
+        cutoff = time.monotonic() - self.retention_seconds
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job) -> None:
+        if job.cancel_event.is_set():
+            job._publish(state=JobState.CANCELLED)
+            return
+
+        job._publish(state=JobState.RUNNING)
+        try:
+            for update in run_job(job.config, cancel_event=job.cancel_event):
+                job._publish(update)
+        except JobCancelled:
+            job._publish(state=JobState.CANCELLED)
+            return
+        except Exception as e:
+            print(f"[JobManager] Job {job.id} failed: {e}")
+            job.error = str(e)
+            job._publish(state=JobState.FAILED)
+            return
+
+        job._publish(state=JobState.SUCCEEDED)
@@ -1,15 +1,22 @@
+import difflib
 import os
 import subprocess
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Generator, List, Optional
+from typing import Callable, Dict, Generator, List, Optional, Sequence, Tuple, Union
 from urllib.parse import quote
 
-from faster_whisper import WhisperModel
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
+from faster_whisper.vad import SpeechTimestampsMap
 
-from src.deepseek_client import DeepSeekClient
-from src.subtitles import SubtitleSegment, write_srt, write_vtt
+from src.deepseek_client import CONTEXT_LINES, DeepSeekClient, UsageStats, prices_for
+from src.subtitles import SubtitleSegment, load_segments, read_subtitles, save_segments, write_srt, write_vtt
+from src.vad_cache import SAMPLING_RATE, collect_speech, load_speech_map
 from src.workspace import Workspace, create_workspace, ensure_local_media, set_media_path
 
 
@@ -24,8 +31,18 @@ class PipelineConfig:
     deepseek_api_key: str
     deepseek_base_url: str
     deepseek_model: str
-    translation_target: str
+    # A single language code or a list of them
+    translation_target: Union[str, Sequence[str]]
     proxy: Optional[str] = None
+    # Source term -> preferred translation, sent with every translation request
+    glossary: Optional[Dict[str, str]] = None
+    # Transcode a small preview copy in the background for remote reviewers
+    preview_proxy: bool = False
+
+    @property
+    def translation_targets(self) -> List[str]:
+        targets = [self.translation_target] if isinstance(self.translation_target, str) else self.translation_target
+        return list(dict.fromkeys(t for t in targets if t))
 
 
 @dataclass(frozen=True)
@@ -41,6 +58,31 @@ class JobUpdate:
     translated_srt_path: Optional[str]
     bilingual_srt_path: Optional[str]
     workspace_dir: str
+    # The single-path fields above point at the first target; every target's
+    # tracks are listed here, keyed by language then by "translated_vtt" etc.
+    translations: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    metrics: Dict[str, float] = field(default_factory=dict)
+    # Configured or detected language of the transcript, once known
+    source_language: Optional[str] = None
+    # Low-bitrate copy of the video for the web player, once encoded
+    preview_path: Optional[str] = None
+
+
+def validate_config(cfg: PipelineConfig) -> None:
+    """Reject configs that cannot run, before any work is queued or started."""
+    if not cfg.url and not cfg.local_video_path:
+        raise ValueError("Provide either a URL or a local video file")
+    if not cfg.translation_targets:
+        raise ValueError("At least one translation target is required")
+
+
+class JobCancelled(Exception):
+    """Raised by run_job when cancellation is requested."""
+
+
+def _check_cancelled(cancel_event: Optional[threading.Event]) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled()
 
 
 def _run_command(args: List[str], restore_proxy: bool = False) -> None:
@@ -100,20 +142,145 @@ def _extract_audio(video_path: Path, audio_path: Path) -> None:
     _run_command(args)
 
 
-def _transcribe(cfg: PipelineConfig, audio_path: Path) -> List[SubtitleSegment]:
-    language = None if cfg.transcription_language == "auto" else cfg.transcription_language
+def _transcode_preview(video_path: Path, preview_path: Path) -> None:
+    # Encode to a temporary name so the player never picks up a partial file
+    partial_path = preview_path.with_name("preview.partial.mp4")
+    args = [
+        "ffmpeg",
+        "-y",
+        "-i",
+        str(video_path),
+        "-vf",
+        "scale=-2:'min(480,ih)'",
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-crf",
+        "30",
+        "-c:a",
+        "aac",
+        "-b:a",
+        "96k",
+        "-movflags",
+        "+faststart",
+        str(partial_path),
+    ]
+    _run_command(args)
+    partial_path.replace(preview_path)
+
+
+def _preview_stage(video_path: Path, workspace: Workspace) -> None:
+    start = time.perf_counter()
+    _transcode_preview(video_path, workspace.preview_path)
+    # Runs alongside the other stages, so it keeps its own metrics file
+    workspace.record_metrics({"preview_proxy_seconds": round(time.perf_counter() - start, 3)}, scope="preview")
+
+
+def _start_preview_proxy(video_path: Path, workspace: Workspace) -> threading.Thread:
+    def _encode() -> None:
+        try:
+            _preview_stage(video_path, workspace)
+        except Exception as e:
+            # The full-size video still works as a fallback
+            print(f"[Pipeline] Preview proxy failed: {e}")
+
+    thread = threading.Thread(target=_encode, name="preview-proxy")
+    thread.start()
+    return thread
 
+
+LANGUAGE_DETECTION_SECONDS = 30
+# Below this detection probability a target that looks like the source
+# language is still translated, rather than trusting a shaky guess.
+LANGUAGE_SKIP_MIN_PROBABILITY = 0.8
+
+
+def _same_language(a: str, b: str) -> bool:
+    # Whisper detects only base codes, and "zh" -> "zh-TW" or "pt" -> "pt-BR"
+    # is still a real translation, so only an exact match is skipped
+    return a.strip().lower() == b.strip().lower()
+
+
+def _resolve_language(
+    cfg: PipelineConfig,
+    model: WhisperModel,
+    workspace: Workspace,
+    speech: np.ndarray,
+) -> Optional[str]:
+    """Return the source language, detecting it once per workspace for "auto".
+
+    Detection runs on the first LANGUAGE_DETECTION_SECONDS of detected speech
+    (the same window transcribe's own detection would see) and is cached in
+    the workspace with its probability, so retries and later passes skip it.
+    Returns None if this faster-whisper version cannot detect separately from
+    transcribe.
+    """
+    if cfg.transcription_language != "auto":
+        workspace.save_language(cfg.transcription_language, 1.0)
+        return cfg.transcription_language
+
+    cached = workspace.read_language()
+    if cached is not None:
+        return cached[0]
+
+    if not hasattr(model, "detect_language"):
+        return None
+
+    start = time.perf_counter()
+    language, probability, _ = model.detect_language(speech[: LANGUAGE_DETECTION_SECONDS * SAMPLING_RATE])
+    workspace.save_language(language, float(probability))
+    workspace.record_metrics({
+        "language_detection_seconds": round(time.perf_counter() - start, 3),
+        "language_probability": round(float(probability), 3),
+    })
+    print(f"[Pipeline] Detected language: {language} (p={probability:.2f})")
+    return language
+
+
+def _transcribe(
+    cfg: PipelineConfig, workspace: Workspace, cancel_event: Optional[threading.Event] = None
+) -> List[SubtitleSegment]:
     model = WhisperModel(cfg.model_size, device=cfg.device, compute_type=cfg.compute_type)
-    segments_iter, _info = model.transcribe(
-        str(audio_path),
+
+    # Run VAD ourselves so its speech map can be cached and reused by every
+    # later transcription of the same audio, whatever the model or language.
+    # The speech is then cut out and re-timed exactly as `vad_filter=True`
+    # would, so the transcript does not depend on whether the map was cached.
+    audio = decode_audio(str(workspace.audio_path), sampling_rate=SAMPLING_RATE)
+    speech_map, vad_seconds, cache_hit = load_speech_map(audio, workspace.audio_path, workspace.vad_cache_dir)
+    workspace.record_metrics({
+        "vad_seconds": 0.0 if cache_hit else round(vad_seconds, 3),
+        "vad_cache_hit": 1.0 if cache_hit else 0.0,
+        "vad_seconds_saved": round(vad_seconds, 3) if cache_hit else 0.0,
+    })
+    if not speech_map:
+        print("[Pipeline] No speech detected; skipping transcription")
+        return []
+
+    speech = collect_speech(audio, speech_map)
+    language = _resolve_language(cfg, model, workspace, speech)
+    segments_iter, info = model.transcribe(
+        speech,
         language=language,
-        vad_filter=True,
+        vad_filter=False,
         beam_size=5,
     )
+    if language is None:
+        workspace.save_language(info.language, float(info.language_probability))
 
+    timestamps = SpeechTimestampsMap(speech_map, SAMPLING_RATE)
     segments: List[SubtitleSegment] = []
+    # Segments are decoded lazily, so this is where the time goes
     for seg in segments_iter:
-        segments.append(SubtitleSegment(start=float(seg.start), end=float(seg.end), text=(seg.text or "").strip()))
+        _check_cancelled(cancel_event)
+        segments.append(
+            SubtitleSegment(
+                start=float(timestamps.get_original_time(seg.start)),
+                end=float(timestamps.get_original_time(seg.end, is_end=True)),
+                text=(seg.text or "").strip(),
+            )
+        )
 
     return segments
 
@@ -121,12 +288,24 @@ def _transcribe(cfg: PipelineConfig, audio_path: Path) -> List[SubtitleSegment]:
 def _translate_segments(
     cfg: PipelineConfig,
     segments: List[SubtitleSegment],
+    target_language: str,
+    stats: Optional[UsageStats] = None,
+    context: Sequence[Tuple[str, str]] = (),
+    cancel_event: Optional[threading.Event] = None,
 ) -> List[SubtitleSegment]:
+    """Translate `segments` in batches.
+
+    `context` holds the (source, translation) pairs of the lines just before
+    `segments[0]`, if any were translated earlier. `cancel_event` is checked
+    before each batch.
+    """
     client = DeepSeekClient(
         base_url=cfg.deepseek_base_url,
         api_key=cfg.deepseek_api_key,
         model=cfg.deepseek_model,
         proxy=cfg.proxy or "",
+        glossary=cfg.glossary,
+        stats=stats,
     )
 
     batch_size = 20
@@ -134,8 +313,12 @@ def _translate_segments(
     texts = [s.text for s in segments]
 
     for i in range(0, len(texts), batch_size):
+        _check_cancelled(cancel_event)
         batch = texts[i : i + batch_size]
-        translated_texts.extend(client.translate_batch(batch, cfg.translation_target))
+        # The tail of the previous batch keeps wording consistent across batches
+        start = max(0, i - CONTEXT_LINES)
+        preceding = list(context) + list(zip(texts[start:i], translated_texts[start:i]))
+        translated_texts.extend(client.translate_batch(batch, target_language, preceding[-CONTEXT_LINES:]))
 
     if len(translated_texts) != len(segments):
         raise RuntimeError("Translation output length mismatch")
@@ -147,106 +330,359 @@ def _translate_segments(
     return out
 
 
-def run_job(cfg: PipelineConfig) -> Generator[JobUpdate, None, None]:
-    if not cfg.url and not cfg.local_video_path:
-        raise ValueError("Provide either a URL or a local video file")
-
-    workspace = create_workspace()
-
-    yield JobUpdate(
-        status_markdown="**Starting job...**",
-        video_path=None,
-        original_vtt_path=None,
-        translated_vtt_path=None,
-        bilingual_vtt_path=None,
-        original_srt_path=None,
-        translated_srt_path=None,
-        bilingual_srt_path=None,
+def _translate_all(
+    cfg: PipelineConfig,
+    segments: List[SubtitleSegment],
+    source: Optional[Tuple[str, float]] = None,
+    translate: Optional[Callable[[str, UsageStats], List[SubtitleSegment]]] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> Tuple[Dict[str, List[SubtitleSegment]], Dict[str, float]]:
+    """Translate the shared transcript into every target concurrently.
+
+    `source` is the transcript's language and detection probability. Targets
+    matching it reuse the transcript without any API calls, unless the
+    probability is below LANGUAGE_SKIP_MIN_PROBABILITY. `translate` overrides
+    how one target is translated (defaults to a full pass). Returns the
+    translated segments, and metrics with the wall time and API usage per
+    language.
+    """
+    targets = cfg.translation_targets
+    if not targets:
+        raise ValueError("At least one translation target is required")
+
+    def _full(target: str, stats: UsageStats) -> List[SubtitleSegment]:
+        return _translate_segments(cfg, segments, target, stats, cancel_event=cancel_event)
+
+    translate = translate or _full
+    usage = {target: UsageStats() for target in targets}
+
+    def _timed(target: str) -> Tuple[List[SubtitleSegment], float]:
+        start = time.perf_counter()
+        translated = translate(target, usage[target])
+        return translated, time.perf_counter() - start
+
+    skipped = []
+    if source is not None:
+        source_language, probability = source
+        same = [t for t in targets if _same_language(t, source_language)]
+        if probability >= LANGUAGE_SKIP_MIN_PROBABILITY:
+            skipped = same
+        elif same:
+            print(f"[Pipeline] Source language {source_language} is uncertain (p={probability:.2f}); translating anyway")
+    pending = [t for t in targets if t not in skipped]
+
+    results: Dict[str, Tuple[List[SubtitleSegment], float]] = {t: (segments, 0.0) for t in skipped}
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(len(pending), 4), thread_name_prefix="translate") as pool:
+            results.update(zip(pending, pool.map(_timed, pending)))
+
+    translations = {target: results[target][0] for target in targets}
+    timings = {f"translate_{target}_seconds": round(results[target][1], 3) for target in targets}
+    timings.update({f"translate_{target}_skipped": 1.0 for target in skipped})
+    prices = prices_for(cfg.deepseek_base_url, cfg.deepseek_model)
+    for target in pending:
+        timings.update(usage[target].as_metrics(f"deepseek_{target}_", prices))
+    timings.update(UsageStats.combine(usage.values()).as_metrics("deepseek_", prices))
+    return translations, timings
+
+
+STAGES = ("download", "transcribe", "translate")
+# Runs next to the main stages once "download" is done, when preview_proxy is set
+PREVIEW_STAGE = "preview"
+
+
+def _job_update(
+    cfg: PipelineConfig,
+    workspace: Workspace,
+    status_markdown: str,
+    video_path: Optional[Path] = None,
+    original: bool = False,
+    translated: bool = False,
+) -> JobUpdate:
+    translations: Dict[str, Dict[str, str]] = {}
+    if translated:
+        for language in cfg.translation_targets:
+            translations[language] = {
+                "translated_srt": str(workspace.translated_path(language, ".srt")),
+                "translated_vtt": str(workspace.translated_path(language, ".vtt")),
+                "bilingual_srt": str(workspace.bilingual_path(language, ".srt")),
+                "bilingual_vtt": str(workspace.bilingual_path(language, ".vtt")),
+            }
+    primary = translations.get(cfg.translation_targets[0], {}) if cfg.translation_targets else {}
+    language = workspace.read_language()
+
+    return JobUpdate(
+        status_markdown=status_markdown,
+        video_path=str(video_path) if video_path else None,
+        original_vtt_path=str(workspace.original_vtt_path) if original else None,
+        translated_vtt_path=primary.get("translated_vtt"),
+        bilingual_vtt_path=primary.get("bilingual_vtt"),
+        original_srt_path=str(workspace.original_srt_path) if original else None,
+        translated_srt_path=primary.get("translated_srt"),
+        bilingual_srt_path=primary.get("bilingual_srt"),
         workspace_dir=str(workspace.root),
+        translations=translations,
+        metrics=workspace.read_metrics(),
+        source_language=language[0] if language else None,
+        preview_path=str(workspace.preview_path) if workspace.preview_path.exists() else None,
     )
 
+
+def _acquire_media(cfg: PipelineConfig, workspace: Workspace) -> Path:
     if cfg.url:
-        yield JobUpdate(
-            status_markdown="**Downloading video...**",
-            video_path=None,
-            original_vtt_path=None,
-            translated_vtt_path=None,
-            bilingual_vtt_path=None,
-            original_srt_path=None,
-            translated_srt_path=None,
-            bilingual_srt_path=None,
-            workspace_dir=str(workspace.root),
-        )
         downloaded = _download_with_ytdlp(cfg.url, workspace, cfg.proxy)
-        video_path = set_media_path(workspace, str(downloaded))
-    else:
-        video_path = ensure_local_media(workspace, cfg.local_video_path or "")
-
-    yield JobUpdate(
-        status_markdown="**Extracting audio...**",
-        video_path=str(video_path),
-        original_vtt_path=None,
-        translated_vtt_path=None,
-        bilingual_vtt_path=None,
-        original_srt_path=None,
-        translated_srt_path=None,
-        bilingual_srt_path=None,
-        workspace_dir=str(workspace.root),
-    )
-    _extract_audio(video_path, workspace.audio_path)
+        return set_media_path(workspace, str(downloaded))
+    return ensure_local_media(workspace, cfg.local_video_path or "")
 
-    yield JobUpdate(
-        status_markdown="**Transcribing (this may take a while)...**",
-        video_path=str(video_path),
-        original_vtt_path=None,
-        translated_vtt_path=None,
-        bilingual_vtt_path=None,
-        original_srt_path=None,
-        translated_srt_path=None,
-        bilingual_srt_path=None,
-        workspace_dir=str(workspace.root),
-    )
-    segments = _transcribe(cfg, workspace.audio_path)
+
+def _write_original(workspace: Workspace, segments: List[SubtitleSegment]) -> None:
+    save_segments(workspace.transcript_path, segments)
     write_srt(workspace.original_srt_path, segments)
     write_vtt(workspace.original_vtt_path, segments)
 
-    yield JobUpdate(
-        status_markdown="**Transcription complete. Translating...**",
-        video_path=str(video_path),
-        original_vtt_path=str(workspace.original_vtt_path),
-        translated_vtt_path=None,
-        bilingual_vtt_path=None,
-        original_srt_path=str(workspace.original_srt_path),
-        translated_srt_path=None,
-        bilingual_srt_path=None,
-        workspace_dir=str(workspace.root),
-    )
 
-    translated_segments = _translate_segments(cfg, segments)
-    write_srt(workspace.translated_srt_path, translated_segments)
-    write_vtt(workspace.translated_vtt_path, translated_segments)
-
-    # Create bilingual segments
+def _write_translations(
+    workspace: Workspace,
+    language: str,
+    segments: List[SubtitleSegment],
+    translated_segments: List[SubtitleSegment],
+) -> None:
+    save_segments(workspace.translated_path(language, ".json"), translated_segments)
+    write_srt(workspace.translated_path(language, ".srt"), translated_segments)
+    write_vtt(workspace.translated_path(language, ".vtt"), translated_segments)
+
+    # Create bilingual segments; lines left unchanged by translation
+    # (e.g. the source is already in the target language) appear once
     bilingual_segments: List[SubtitleSegment] = []
     for orig, trans in zip(segments, translated_segments):
         bilingual_segments.append(
             SubtitleSegment(
                 start=orig.start,
                 end=orig.end,
-                text=f"{orig.text}\n{trans.text}"
+                text=orig.text if trans.text == orig.text else f"{orig.text}\n{trans.text}"
             )
         )
-    write_srt(workspace.bilingual_srt_path, bilingual_segments)
-    write_vtt(workspace.bilingual_vtt_path, bilingual_segments)
-
-    yield JobUpdate(
-        status_markdown="**All Done!**",
-        video_path=str(video_path),
-        original_vtt_path=str(workspace.original_vtt_path),
-        translated_vtt_path=str(workspace.translated_vtt_path),
-        bilingual_vtt_path=str(workspace.bilingual_vtt_path),
-        original_srt_path=str(workspace.original_srt_path),
-        translated_srt_path=str(workspace.translated_srt_path),
-        bilingual_srt_path=str(workspace.bilingual_srt_path),
-        workspace_dir=str(workspace.root),
+    write_srt(workspace.bilingual_path(language, ".srt"), bilingual_segments)
+    write_vtt(workspace.bilingual_path(language, ".vtt"), bilingual_segments)
+
+
+def _download_stage(cfg: PipelineConfig, workspace: Workspace) -> Path:
+    start = time.perf_counter()
+    video_path = _acquire_media(cfg, workspace)
+    _extract_audio(video_path, workspace.audio_path)
+    workspace.record_metrics({"download_seconds": round(time.perf_counter() - start, 3)})
+    return video_path
+
+
+def _transcribe_stage(
+    cfg: PipelineConfig, workspace: Workspace, cancel_event: Optional[threading.Event] = None
+) -> List[SubtitleSegment]:
+    start = time.perf_counter()
+    segments = _transcribe(cfg, workspace, cancel_event)
+    _write_original(workspace, segments)
+    workspace.record_metrics({"transcribe_seconds": round(time.perf_counter() - start, 3)})
+    return segments
+
+
+def _translate_stage(
+    cfg: PipelineConfig,
+    workspace: Workspace,
+    segments: List[SubtitleSegment],
+    cancel_event: Optional[threading.Event] = None,
+) -> None:
+    start = time.perf_counter()
+    translations, timings = _translate_all(cfg, segments, workspace.read_language(), cancel_event=cancel_event)
+    for language, translated_segments in translations.items():
+        _write_translations(workspace, language, segments, translated_segments)
+    timings["translate_seconds"] = round(time.perf_counter() - start, 3)
+    workspace.record_metrics(timings)
+
+
+def run_stage(stage: str, cfg: PipelineConfig, workspace: Workspace) -> JobUpdate:
+    """Run one pipeline stage against an existing workspace.
+
+    Stages only communicate through files in the workspace, so each one can
+    run on a different machine as long as the workspace is on shared storage.
+    """
+    if stage == "download":
+        video_path = _download_stage(cfg, workspace)
+        return _job_update(cfg, workspace, "**Audio extracted. Waiting for transcription...**", video_path)
+
+    video_path = workspace.find_media()
+    if stage == "transcribe":
+        _transcribe_stage(cfg, workspace)
+        return _job_update(
+            cfg, workspace, "**Transcription complete. Waiting for translation...**", video_path, original=True
+        )
+
+    if stage == "translate":
+        _translate_stage(cfg, workspace, load_segments(workspace.transcript_path))
+        return _job_update(cfg, workspace, "**All Done!**", video_path, original=True, translated=True)
+
+    if stage == PREVIEW_STAGE:
+        if video_path is None:
+            raise FileNotFoundError(f"No downloaded media in {workspace.root}")
+        _preview_stage(video_path, workspace)
+        return _job_update(cfg, workspace, "**Preview proxy ready.**", video_path)
+
+    raise ValueError(f"Unknown pipeline stage: {stage}")
+
+
+def run_job(cfg: PipelineConfig, cancel_event: Optional[threading.Event] = None) -> Generator[JobUpdate, None, None]:
+    """Run every stage in-process, yielding progress updates.
+
+    `cancel_event` is checked before each stage, between transcribed
+    segments and between translation batches; once the translations are
+    written the job always runs to completion.
+    """
+    validate_config(cfg)
+
+    workspace = create_workspace()
+
+    yield _job_update(cfg, workspace, "**Starting job...**")
+
+    _check_cancelled(cancel_event)
+    start = time.perf_counter()
+    if cfg.url:
+        yield _job_update(cfg, workspace, "**Downloading video...**")
+    video_path = _acquire_media(cfg, workspace)
+    preview_thread = _start_preview_proxy(video_path, workspace) if cfg.preview_proxy else None
+
+    yield _job_update(cfg, workspace, "**Extracting audio...**", video_path)
+    _extract_audio(video_path, workspace.audio_path)
+    workspace.record_metrics({"download_seconds": round(time.perf_counter() - start, 3)})
+
+    _check_cancelled(cancel_event)
+    yield _job_update(cfg, workspace, "**Transcribing (this may take a while)...**", video_path)
+    segments = _transcribe_stage(cfg, workspace, cancel_event)
+
+    targets = ", ".join(cfg.translation_targets)
+    yield _job_update(cfg, workspace, f"**Transcription complete. Translating ({targets})...**", video_path, original=True)
+
+    _check_cancelled(cancel_event)
+    _translate_stage(cfg, workspace, segments, cancel_event)
+
+    if preview_thread is not None and preview_thread.is_alive():
+        yield _job_update(
+            cfg, workspace, "**All Done!** Preview proxy is still encoding...", video_path, original=True, translated=True
+        )
+        preview_thread.join()
+
+    yield _job_update(cfg, workspace, "**All Done!**", video_path, original=True, translated=True)
+
+
+RETRANSLATE_CONTEXT = 2
+
+
+def _plan_retranslation(
+    previous: List[SubtitleSegment],
+    edited: List[SubtitleSegment],
+    context: int,
+) -> Tuple[Dict[int, int], List[int]]:
+    """Diff two transcripts by cue text.
+
+    Returns a map from unchanged edited cues to their previous index, and the
+    edited cue indices to re-translate: changed or inserted cues plus
+    `context` neighbours on each side (also around deletions).
+    """
+    matcher = difflib.SequenceMatcher(
+        a=[" ".join(s.text.split()) for s in previous],
+        b=[" ".join(s.text.split()) for s in edited],
+        autojunk=False,
+    )
+    reuse: Dict[int, int] = {}
+    changed = set()
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            reuse.update({j1 + k: i1 + k for k in range(j2 - j1)})
+        else:
+            changed.update(range(max(0, j1 - context), min(len(edited), j2 + context)))
+
+    return reuse, sorted(changed)
+
+
+def _contiguous_runs(indices: List[int]) -> List[List[int]]:
+    runs: List[List[int]] = []
+    for i in indices:
+        if runs and runs[-1][-1] == i - 1:
+            runs[-1].append(i)
+        else:
+            runs.append([i])
+    return runs
+
+
+def _load_previous_translation(workspace: Workspace, language: str, count: int) -> Optional[List[SubtitleSegment]]:
+    json_path = workspace.translated_path(language, ".json")
+    srt_path = workspace.translated_path(language, ".srt")
+    if json_path.exists():
+        segments = load_segments(json_path)
+    elif srt_path.exists():
+        segments = read_subtitles(srt_path)
+    else:
+        return None
+    return segments if len(segments) == count else None
+
+
+def run_retranslation(
+    cfg: PipelineConfig,
+    workspace: Workspace,
+    edited_subtitle_path: str,
+    context: int = RETRANSLATE_CONTEXT,
+) -> Generator[JobUpdate, None, None]:
+    """Refresh a finished job's translations after the original track was edited.
+
+    Only cues that differ from the workspace's transcript (plus a small
+    context window) are sent for translation; every other cue keeps its
+    previous translation and takes the edited timing.
+    """
+    if not cfg.translation_targets:
+        raise ValueError("At least one translation target is required")
+
+    edited = read_subtitles(Path(edited_subtitle_path))
+    if not edited:
+        raise ValueError(f"No subtitle cues found in {edited_subtitle_path}")
+
+    if workspace.transcript_path.exists():
+        previous = load_segments(workspace.transcript_path)
+    else:
+        previous = read_subtitles(workspace.original_srt_path)
+
+    video_path = workspace.find_media()
+    reuse, changed = _plan_retranslation(previous, edited, context)
+    yield _job_update(
+        cfg, workspace, f"**Re-translating {len(changed)} of {len(edited)} cues...**", video_path, original=True
     )
+
+    start = time.perf_counter()
+
+    def _incremental(target: str, stats: UsageStats) -> List[SubtitleSegment]:
+        old = _load_previous_translation(workspace, target, len(previous))
+        if old is None:
+            print(f"[Pipeline] No previous {target} translation to reuse; translating all cues")
+            return _translate_segments(cfg, edited, target, stats)
+
+        texts = {i: old[j].text for i, j in reuse.items()}
+        # One request per run of changed cues, so each run gets the
+        # translations of the cues just before it as context
+        for run in _contiguous_runs(changed):
+            first = run[0]
+            preceding = [(edited[k].text, texts[k]) for k in range(max(0, first - CONTEXT_LINES), first)]
+            fresh = _translate_segments(cfg, [edited[i] for i in run], target, stats, preceding)
+            texts.update({i: seg.text for i, seg in zip(run, fresh)})
+        return [SubtitleSegment(start=seg.start, end=seg.end, text=texts[i]) for i, seg in enumerate(edited)]
+
+    translations, timings = _translate_all(cfg, edited, workspace.read_language(), translate=_incremental)
+    for language, translated_segments in translations.items():
+        _write_translations(workspace, language, edited, translated_segments)
+    # Only now replace the transcript: if translation failed, the workspace
+    # still pairs the old transcript with the translations made from it, and
+    # a retry diffs against the right baseline.
+    _write_original(workspace, edited)
+
+    # Keep the original job's translation metrics next to the re-run's
+    metrics = {("re" if key.startswith("translate_") else "retranslate_") + key: value for key, value in timings.items()}
+    metrics["retranslated_cues"] = float(len(changed))
+    metrics["retranslate_seconds"] = round(time.perf_counter() - start, 3)
+    workspace.record_metrics(metrics)
+
+    yield _job_update(cfg, workspace, "**All Done!**", video_path, original=True, translated=True)
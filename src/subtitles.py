@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import re
+from dataclasses import asdict, dataclass
 from datetime import timedelta
 from pathlib import Path
 from typing import Iterable, List
@@ -15,7 +17,7 @@ class SubtitleSegment:
 
 def _format_srt_timestamp(seconds: float) -> str:
     td = timedelta(seconds=max(0.0, seconds))
-    total_ms = int(td.total_seconds() * 1000)
+    total_ms = round(td.total_seconds() * 1000)
     hours = total_ms // 3600000
     minutes = (total_ms % 3600000) // 60000
     secs = (total_ms % 60000) // 1000
@@ -25,7 +27,7 @@ def _format_srt_timestamp(seconds: float) -> str:
 
 def _format_vtt_timestamp(seconds: float) -> str:
     td = timedelta(seconds=max(0.0, seconds))
-    total_ms = int(td.total_seconds() * 1000)
+    total_ms = round(td.total_seconds() * 1000)
     hours = total_ms // 3600000
     minutes = (total_ms % 3600000) // 60000
     secs = (total_ms % 60000) // 1000
@@ -63,6 +65,44 @@ def _wrap_text(text: str, max_len: int = 80) -> str:
     return "\n".join(lines)
 
 
+_TIMESTAMP_RE = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{1,3})")
+
+
+def _parse_timestamp(value: str) -> float:
+    match = _TIMESTAMP_RE.fullmatch(value.strip())
+    if not match:
+        raise ValueError(f"Invalid subtitle timestamp: {value!r}")
+    hours, minutes, secs, ms = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(secs) + int(ms.ljust(3, "0")) / 1000
+
+
+def parse_subtitles(content: str) -> List[SubtitleSegment]:
+    """Parse SRT or WebVTT text back into segments.
+
+    Cue numbers, VTT headers, NOTE/STYLE blocks and cue settings are ignored.
+    Lines wrapped by _wrap_text are joined back into a single line.
+    """
+    segments: List[SubtitleSegment] = []
+    blocks = re.split(r"\n\s*\n", content.replace("\r\n", "\n").replace("\r", "\n").lstrip("\ufeff"))
+    for block in blocks:
+        lines = block.strip("\n").split("\n")
+        timing_idx = next((i for i, line in enumerate(lines) if "-->" in line), None)
+        if timing_idx is None:
+            continue
+
+        start_str, end_str = lines[timing_idx].split("-->", 1)
+        # VTT cue settings may follow the end timestamp
+        end_str = end_str.split()[0]
+        text = " ".join(line.strip() for line in lines[timing_idx + 1 :] if line.strip())
+        segments.append(SubtitleSegment(start=_parse_timestamp(start_str), end=_parse_timestamp(end_str), text=text))
+
+    return segments
+
+
+def read_subtitles(path: Path) -> List[SubtitleSegment]:
+    return parse_subtitles(path.read_text(encoding="utf-8"))
+
+
 def write_srt(path: Path, segments: Iterable[SubtitleSegment]) -> None:
     lines: List[str] = []
     for idx, seg in enumerate(segments, start=1):
@@ -82,3 +122,13 @@ def write_vtt(path: Path, segments: Iterable[SubtitleSegment]) -> None:
         lines.append("")
 
     path.write_text("\n".join(lines).strip() + "\n", encoding="utf-8")
+
+
+def save_segments(path: Path, segments: Iterable[SubtitleSegment]) -> None:
+    data = [asdict(seg) for seg in segments]
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+def load_segments(path: Path) -> List[SubtitleSegment]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [SubtitleSegment(start=float(d["start"]), end=float(d["end"]), text=d["text"]) for d in data]
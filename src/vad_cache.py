@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from faster_whisper.vad import VadOptions, collect_chunks, get_speech_timestamps
+
+# {"start": sample, "end": sample} for each speech region, the format
+# faster-whisper's VAD helpers take
+SpeechMap = List[Dict[str, int]]
+
+SAMPLING_RATE = 16000
+
+
+def _audio_key(audio_path: Path) -> str:
+    # The VAD options are part of the key so a faster-whisper upgrade that
+    # changes the defaults does not reuse stale maps.
+    digest = hashlib.sha256(repr(VadOptions()).encode("utf-8"))
+    with audio_path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_speech_map(audio: np.ndarray, audio_path: Path, cache_dir: Path) -> Tuple[SpeechMap, float, bool]:
+    """Return the speech map for `audio`, computing Silero VAD only on a cache miss.
+
+    Maps are cached by audio content hash, so re-runs of the same file with a
+    different model size or language skip VAD entirely. Returns the map, the
+    VAD time (measured now, or saved by the cached run) and whether it was a
+    cache hit.
+    """
+    cache_path = cache_dir / f"{_audio_key(audio_path)}.json"
+    cached = _read_cache(cache_path)
+    if cached is not None:
+        return cached[0], cached[1], True
+
+    start = time.perf_counter()
+    speech_map = [
+        {"start": int(ts["start"]), "end": int(ts["end"])}
+        for ts in get_speech_timestamps(audio, VadOptions(), sampling_rate=SAMPLING_RATE)
+    ]
+    elapsed = time.perf_counter() - start
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Write to a file of our own, then rename, so concurrent workers neither
+    # read a partial file nor write into each other's
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=cache_dir, suffix=".partial", delete=False
+    ) as f:
+        json.dump({"speech": speech_map, "vad_seconds": elapsed}, f)
+    os.replace(f.name, cache_path)
+    return speech_map, elapsed, False
+
+
+def _read_cache(cache_path: Path) -> Optional[Tuple[SpeechMap, float]]:
+    if not cache_path.exists():
+        return None
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+        speech_map = [{"start": int(c["start"]), "end": int(c["end"])} for c in data["speech"]]
+        return speech_map, float(data["vad_seconds"])
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"[VadCache] Ignoring unreadable cache entry {cache_path.name}: {e}")
+        return None
+
+
+def collect_speech(audio: np.ndarray, speech_map: SpeechMap) -> np.ndarray:
+    """Concatenate the speech regions of `audio`, as faster-whisper's `vad_filter` does."""
+    audio_chunks, _ = collect_chunks(audio, speech_map, sampling_rate=SAMPLING_RATE)
+    return np.concatenate(audio_chunks, axis=0)
@@ -0,0 +1,196 @@
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from dataclasses import replace
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+from src.deepseek_client import DEFAULT_DEEPSEEK_BASE_URL
+from src.job_store import JobRecord, JobStore, SQLiteJobStore
+from src.pipeline import PREVIEW_STAGE, STAGES, JobUpdate, PipelineConfig, run_stage
+from src.workspace import Workspace
+
+STAGE_STATUS = {
+    "download": "**Downloading video and extracting audio...**",
+    "transcribe": "**Transcribing (this may take a while)...**",
+    "translate": "**Translating...**",
+    PREVIEW_STAGE: "**Encoding preview proxy...**",
+}
+
+WORKER_STAGES = (*STAGES, PREVIEW_STAGE)
+
+# Stages start in a fresh interpreter rather than a fork of the worker, whose
+# heartbeat thread and any CUDA state would not survive forking
+START_METHOD = "spawn"
+
+
+def _stage_process(stage: str, cfg: PipelineConfig, workspace_dir: str, conn: Connection) -> None:
+    # A process group of its own lets the worker kill the ffmpeg and yt-dlp
+    # children along with the stage.
+    if hasattr(os, "setsid"):
+        os.setsid()
+    try:
+        conn.send((run_stage(stage, cfg, Workspace(root=Path(workspace_dir))), None))
+    except Exception as e:
+        conn.send((None, str(e)))
+    finally:
+        conn.close()
+
+
+def _with_worker_credentials(cfg: PipelineConfig) -> PipelineConfig:
+    """Fill in this worker's DeepSeek API key, which the job store never holds.
+
+    The key is only used for the endpoint the worker is configured for, so a
+    job pointing at another base URL cannot collect it.
+    """
+    base_url = os.environ.get("DEEPSEEK_BASE_URL", DEFAULT_DEEPSEEK_BASE_URL)
+    if cfg.deepseek_base_url.rstrip("/") != base_url.rstrip("/"):
+        return cfg
+    return replace(cfg, deepseek_api_key=os.environ.get("DEEPSEEK_API_KEY", ""))
+
+
+def _kill_stage(process: multiprocessing.Process) -> None:
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        # No process groups (Windows), or the child has not called setsid yet
+        process.kill()
+    process.join()
+
+
+class Worker:
+    """Pulls jobs from the shared store and runs the stages it is assigned.
+
+    Run one worker per machine role, e.g. a CPU box with `download`,
+    `translate` and `preview` and a GPU box with `transcribe`.
+
+    Each stage runs in a child process that is killed as soon as the lease is
+    lost, so a stalled worker never writes into a workspace another worker
+    has taken over.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        stages: Sequence[str] = WORKER_STAGES,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 60.0,
+    ) -> None:
+        unknown = [s for s in stages if s not in WORKER_STAGES]
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages: {', '.join(unknown)}")
+
+        self.store = store
+        self.stages = list(stages)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+
+    def run_once(self) -> bool:
+        """Lease and run a single stage. Returns False if there was nothing to do."""
+        job = self.store.lease(self.worker_id, self.stages, self.lease_seconds)
+        if job is None:
+            return False
+
+        print(f"[Worker {self.worker_id}] Job {job.job_id}: running stage '{job.stage}' (attempt {job.attempts})")
+        if job.update is not None:
+            self.store.publish(job.job_id, self.worker_id, replace(job.update, status_markdown=STAGE_STATUS[job.stage]))
+
+        lease_lost = threading.Event()
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat_loop, args=(job, lease_lost, stop_heartbeat), daemon=True
+        )
+        heartbeat.start()
+
+        try:
+            update, error = self._run_stage(job, lease_lost)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+        if lease_lost.is_set():
+            print(f"[Worker {self.worker_id}] Job {job.job_id}: lease lost or job cancelled, stage '{job.stage}' stopped")
+            self.store.release(job.job_id, self.worker_id)
+        elif update is None:
+            print(f"[Worker {self.worker_id}] Job {job.job_id} failed in stage '{job.stage}': {error}")
+            self.store.fail(job.job_id, self.worker_id, f"{job.stage}: {error}")
+        else:
+            self.store.complete_stage(job.job_id, self.worker_id, update)
+        return True
+
+    def _run_stage(self, job: JobRecord, lease_lost: threading.Event) -> Tuple[Optional[JobUpdate], Optional[str]]:
+        """Run the job's stage in a child process, killing it if the lease is lost.
+
+        Returns the stage's update, or None and the error message.
+        """
+        ctx = multiprocessing.get_context(START_METHOD)
+        receiver, sender = ctx.Pipe(duplex=False)
+        process = ctx.Process(
+            target=_stage_process,
+            args=(job.stage, _with_worker_credentials(job.config), job.workspace_dir, sender),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+
+        with receiver:
+            while not lease_lost.is_set():
+                if not receiver.poll(1.0):
+                    continue
+                try:
+                    result = receiver.recv()
+                except EOFError:
+                    # The child died without reporting, e.g. killed by the OOM killer
+                    process.join()
+                    return None, f"stage process exited with code {process.exitcode}"
+                process.join()
+                return result
+
+        _kill_stage(process)
+        return None, None
+
+    def run_forever(self, poll_interval: float = 2.0) -> None:
+        print(f"[Worker {self.worker_id}] Serving stages: {', '.join(self.stages)}")
+        while True:
+            if not self.run_once():
+                time.sleep(poll_interval)
+
+    def _heartbeat_loop(self, job: JobRecord, lease_lost: threading.Event, stop: threading.Event) -> None:
+        last_extended = time.monotonic()
+        while not stop.wait(self.lease_seconds / 3):
+            try:
+                if not self.store.heartbeat(job.job_id, self.worker_id, self.lease_seconds):
+                    lease_lost.set()
+                    return
+                last_extended = time.monotonic()
+            except Exception as e:
+                print(f"[Worker {self.worker_id}] Heartbeat failed: {e}")
+                # Stop before the lease can expire unnoticed
+                if time.monotonic() - last_extended > self.lease_seconds * 2 / 3:
+                    lease_lost.set()
+                    return
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a pipeline worker against a shared job store.")
+    parser.add_argument("--store", default=os.environ.get("JOB_STORE", "runs/jobs.db"), help="Path to the job store database")
+    parser.add_argument("--shared-dir", default=os.environ.get("JOB_SHARED_DIR", "runs"), help="Shared workspace directory")
+    parser.add_argument(
+        "--stages", nargs="+", choices=WORKER_STAGES, default=list(WORKER_STAGES), help="Stages this worker runs"
+    )
+    parser.add_argument("--lease-seconds", type=float, default=60.0)
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    args = parser.parse_args()
+
+    store = SQLiteJobStore(args.store, shared_dir=args.shared_dir)
+    Worker(store, stages=args.stages, lease_seconds=args.lease_seconds).run_forever(args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
+import json
 import os
 import shutil
+import threading
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Sequence, Tuple
+
+# Stages of one job may record metrics concurrently within a process
+_METRICS_LOCK = threading.Lock()
 
 
 @dataclass(frozen=True)
@@ -18,6 +23,14 @@ class Workspace:
     def audio_path(self) -> Path:
         return self.root / "audio.wav"
 
+    @property
+    def preview_path(self) -> Path:
+        return self.root / "preview.mp4"
+
+    @property
+    def transcript_path(self) -> Path:
+        return self.root / "transcript.json"
+
     @property
     def original_srt_path(self) -> Path:
         return self.root / "original.srt"
@@ -27,20 +40,75 @@ class Workspace:
         return self.root / "original.vtt"
 
     @property
-    def translated_srt_path(self) -> Path:
-        return self.root / "translated.srt"
+    def language_path(self) -> Path:
+        return self.root / "language.json"
 
     @property
-    def translated_vtt_path(self) -> Path:
-        return self.root / "translated.vtt"
+    def vad_cache_dir(self) -> Path:
+        # Shared by all workspaces under the same base directory
+        return self.root.parent / "vad-cache"
 
     @property
-    def bilingual_srt_path(self) -> Path:
-        return self.root / "bilingual.srt"
-
-    @property
-    def bilingual_vtt_path(self) -> Path:
-        return self.root / "bilingual.vtt"
+    def metrics_path(self) -> Path:
+        return self.root / "metrics.json"
+
+    def translated_path(self, language: str, suffix: str) -> Path:
+        return self.root / f"translated.{language}{suffix}"
+
+    def bilingual_path(self, language: str, suffix: str) -> Path:
+        return self.root / f"bilingual.{language}{suffix}"
+
+    def find_media(self) -> Optional[Path]:
+        candidates = sorted(self.root.glob(self.media_path.name + ".*"))
+        return candidates[0] if candidates else None
+
+    def subtitle_paths(self, languages: Sequence[str] = ()) -> Dict[str, Path]:
+        """Subtitle artifacts keyed by file name."""
+        paths = [self.original_srt_path, self.original_vtt_path]
+        for language in languages:
+            for suffix in (".srt", ".vtt"):
+                paths.append(self.translated_path(language, suffix))
+                paths.append(self.bilingual_path(language, suffix))
+        return {p.name: p for p in paths}
+
+    def read_language(self) -> Optional[Tuple[str, float]]:
+        """The transcript's source language and its detection probability, if known."""
+        if not self.language_path.exists():
+            return None
+        data = json.loads(self.language_path.read_text(encoding="utf-8"))
+        return data["language"], float(data["probability"])
+
+    def save_language(self, language: str, probability: float) -> None:
+        data = {"language": language, "probability": probability}
+        self.language_path.write_text(json.dumps(data), encoding="utf-8")
+
+    def scoped_metrics_path(self, scope: str) -> Path:
+        return self.root / f"metrics.{scope}.json"
+
+    def read_metrics(self) -> Dict[str, float]:
+        """The job's metrics: the main file merged with every scoped file."""
+        merged: Dict[str, float] = {}
+        for path in [self.metrics_path, *sorted(self.root.glob("metrics.*.json"))]:
+            if path.exists():
+                merged.update(json.loads(path.read_text(encoding="utf-8")))
+        return merged
+
+    def record_metrics(self, metrics: Dict[str, float], scope: Optional[str] = None) -> None:
+        """Merge `metrics` into the workspace's metrics file.
+
+        Metrics live in the workspace so stages run by different workers add
+        to the same record. The pipeline stages run one after another; work
+        that runs alongside them, possibly on another machine, passes a
+        `scope` so it writes a file of its own that no one else rewrites.
+        """
+        path = self.scoped_metrics_path(scope) if scope else self.metrics_path
+        with _METRICS_LOCK:
+            merged = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+            merged.update(metrics)
+            # Write then rename so a concurrent read_metrics never sees a partial file
+            partial_path = path.with_suffix(".partial")
+            partial_path.write_text(json.dumps(merged, indent=1), encoding="utf-8")
+            partial_path.replace(path)
 
 
 def create_workspace(base_dir: str = "runs") -> Workspace:
@@ -57,6 +125,9 @@ def ensure_local_media(workspace: Workspace, local_video_path: str) -> Path:
         raise FileNotFoundError(f"Local video file not found: {local_video_path}")
 
     dst = workspace.media_path.with_suffix(src.suffix)
+    if src.resolve() == dst.resolve():
+        return dst
+
     shutil.copy2(src, dst)
     return dst
 
@@ -0,0 +1,77 @@
+from dataclasses import replace
+from types import SimpleNamespace
+from typing import Callable
+
+import pytest
+
+from src import pipeline
+from src.pipeline import PipelineConfig
+from src.workspace import Workspace, create_workspace
+
+
+@pytest.fixture
+def make_config() -> Callable[..., PipelineConfig]:
+    """Factory for a URL job translated to "zh"; keyword arguments override fields."""
+
+    def factory(**overrides) -> PipelineConfig:
+        cfg = PipelineConfig(
+            url="https://example.com/video",
+            local_video_path=None,
+            transcription_language="auto",
+            model_size="tiny",
+            device="cpu",
+            compute_type="int8",
+            deepseek_api_key="",
+            deepseek_base_url="https://api.deepseek.com",
+            deepseek_model="deepseek-chat",
+            translation_target="zh",
+        )
+        return replace(cfg, **overrides)
+
+    return factory
+
+
+@pytest.fixture
+def workspace(tmp_path) -> Workspace:
+    """A fresh workspace whose audio file holds placeholder bytes."""
+    ws = create_workspace(str(tmp_path / "runs"))
+    ws.audio_path.write_bytes(b"RIFF fake audio")
+    return ws
+
+
+class FakeModel:
+    """Stands in for WhisperModel with a fixed detection result and transcript."""
+
+    # Segment times are relative to the audio passed to transcribe
+    SEGMENTS = [(0.0, 1.5, "first"), (1.5, 2.0, "second"), (2.0, 3.0, "third")]
+
+    def __init__(self) -> None:
+        self.language = "en"
+        self.probability = 0.97
+        self.detected_on = []
+        self.calls = []
+        # Called with each segment's text as the transcript is decoded
+        self.on_segment = None
+
+    def detect_language(self, audio):
+        self.detected_on.append(audio)
+        return self.language, self.probability, []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append((audio, kwargs))
+
+        def decode():
+            for start, end, text in self.SEGMENTS:
+                if self.on_segment is not None:
+                    self.on_segment(text)
+                yield SimpleNamespace(start=start, end=end, text=text, words=None)
+
+        return decode(), SimpleNamespace(language=self.language, language_probability=self.probability)
+
+
+@pytest.fixture
+def fake_model(monkeypatch) -> FakeModel:
+    """A FakeModel that the pipeline gets in place of every WhisperModel."""
+    model = FakeModel()
+    monkeypatch.setattr(pipeline, "WhisperModel", lambda *args, **kwargs: model)
+    return model
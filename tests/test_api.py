@@ -0,0 +1,87 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src import api
+from src.api import config_from_payload, create_api
+from src.job_store import SQLiteJobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / "jobs.db"), shared_dir=str(tmp_path / "runs"))
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    monkeypatch.setattr(api, "STORE_POLL_SECONDS", 0.01)
+    return TestClient(create_api(store=store))
+
+
+def test_store_api_queues_jobs_for_workers(client, store):
+    response = client.post("/api/jobs", json={"url": "https://example.com/video", "translation_target": ["zh", "ja"]})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["state"] == "queued" and job["stage"] == "download"
+
+    record = store.get(job["job_id"])
+    assert record.config.translation_targets == ["zh", "ja"]
+    assert [j["job_id"] for j in client.get("/api/jobs").json()["jobs"]] == [job["job_id"]]
+
+
+def test_store_api_rejects_invalid_jobs(client):
+    assert client.post("/api/jobs", json={"translation_target": "zh"}).status_code == 400
+    assert client.post("/api/jobs", json={"url": "https://example.com", "translation_target": []}).status_code == 400
+    assert client.get("/api/jobs/missing").status_code == 404
+
+
+def test_store_api_cancel_ends_the_event_stream(client):
+    job_id = client.post("/api/jobs", json={"url": "https://example.com/video"}).json()["job_id"]
+    assert client.post(f"/api/jobs/{job_id}/cancel").json()["state"] == "cancelled"
+
+    with client.stream("GET", f"/api/jobs/{job_id}/events") as response:
+        body = "".join(response.iter_text())
+    assert "event: update" in body
+    assert body.rstrip().split("\n\n")[-1].startswith("event: end")
+    assert client.get(f"/api/jobs/{job_id}/artifacts").json() == {"artifacts": []}
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"url": "https://example.com", "translation_target": ["zh", 5]},
+        {"url": "https://example.com", "device": 5},
+        {"url": "https://example.com", "preview_proxy": "yes"},
+        {"url": "https://example.com", "glossary": {"term": 1}},
+        {"url": ["https://example.com"]},
+    ],
+)
+def test_payload_types_are_checked(payload):
+    with pytest.raises(ValueError, match="Invalid value type"):
+        config_from_payload(payload)
+
+
+def test_local_media_requires_api_media_dir(tmp_path, monkeypatch):
+    media = tmp_path / "uploads" / "talk.mp4"
+    media.parent.mkdir()
+    media.write_bytes(b"video")
+    monkeypatch.delenv("API_MEDIA_DIR", raising=False)
+    with pytest.raises(ValueError, match="API_MEDIA_DIR"):
+        config_from_payload({"local_video_path": str(media)})
+
+    monkeypatch.setenv("API_MEDIA_DIR", str(media.parent))
+    assert config_from_payload({"local_video_path": str(media)}).local_video_path == str(media)
+    for outside in ("/etc/passwd", str(media.parent / ".." / "secret.txt")):
+        with pytest.raises(ValueError, match="inside API_MEDIA_DIR"):
+            config_from_payload({"local_video_path": outside})
+
+
+def test_server_key_is_not_sent_to_a_caller_chosen_endpoint(monkeypatch):
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "server-key")
+    assert config_from_payload({"url": "https://example.com"}).deepseek_api_key == "server-key"
+    cfg = config_from_payload({"url": "https://example.com", "deepseek_base_url": "https://attacker.example"})
+    assert cfg.deepseek_api_key == ""
+
+
+def test_store_api_rejects_local_paths(client, monkeypatch):
+    monkeypatch.delenv("API_MEDIA_DIR", raising=False)
+    assert client.post("/api/jobs", json={"local_video_path": "/etc/passwd"}).status_code == 400
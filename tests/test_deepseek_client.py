@@ -0,0 +1,83 @@
+import json
+from types import SimpleNamespace
+
+from src import deepseek_client
+from src.deepseek_client import DeepSeekClient, UsageStats, build_translation_messages, prices_for
+
+
+def test_split_batches_pass_the_left_half_as_context(monkeypatch):
+    client = DeepSeekClient(base_url="https://api.deepseek.com", api_key="key", model="deepseek-chat")
+    calls = []
+
+    def fake_chunk(self, texts, target_language, context=None):
+        calls.append((list(texts), list(context or [])))
+        if len(texts) > 2:
+            raise ValueError("response too long")
+        return [f"zh {t}" for t in texts]
+
+    monkeypatch.setattr(DeepSeekClient, "_translate_chunk_with_retries", fake_chunk)
+    out = client.translate_batch(["a", "b", "c", "d"], "zh", context=[("x", "zh x")])
+
+    assert out == ["zh a", "zh b", "zh c", "zh d"]
+    assert calls[1:] == [
+        (["a", "b"], [("x", "zh x")]),
+        (["c", "d"], [("x", "zh x"), ("a", "zh a"), ("b", "zh b")]),
+    ]
+
+
+def test_cost_is_only_estimated_for_known_deepseek_models():
+    stats = UsageStats()
+    usage = {
+        "prompt_tokens": 1000,
+        "completion_tokens": 500,
+        "prompt_cache_hit_tokens": 800,
+        "prompt_cache_miss_tokens": 200,
+    }
+    stats.record(usage, 0.5)
+
+    prices = prices_for("https://api.deepseek.com/v1", "deepseek-chat")
+    metrics = stats.as_metrics("deepseek_", prices)
+    assert metrics["deepseek_cache_hit_ratio"] == 0.8
+    assert metrics["deepseek_estimated_cost_usd"] == round((800 * 0.028 + 200 * 0.28 + 500 * 0.42) / 1e6, 6)
+
+    assert prices_for("https://api.deepseek.com", "some-other-model") is None
+    assert prices_for("https://llm.example.com/v1", "deepseek-chat") is None
+    assert "deepseek_estimated_cost_usd" not in stats.as_metrics("deepseek_", None)
+
+
+def test_batches_for_a_target_share_the_message_prefix():
+    # Everything before the items must be byte-identical for the API's prefix cache
+    glossary = {"Whisper": "Whisper", "cue": "字幕"}
+    first = build_translation_messages(["a", "b"], "zh", glossary)
+    second = build_translation_messages(["c"], "zh", dict(reversed(glossary.items())))
+
+    assert first[0] == second[0]
+    first_prefix, first_items = first[1]["content"].split("Input JSON:\n")
+    second_prefix, second_items = second[1]["content"].split("Input JSON:\n")
+    assert first_prefix == second_prefix
+    assert (json.loads(first_items), json.loads(second_items)) == (["a", "b"], ["c"])
+
+
+def test_response_usage_is_recorded(monkeypatch):
+    usage = {
+        "prompt_tokens": 120,
+        "completion_tokens": 30,
+        "prompt_cache_hit_tokens": 100,
+        "prompt_cache_miss_tokens": 20,
+    }
+    requests_sent = []
+
+    def fake_post(url, **kwargs):
+        requests_sent.append((url, kwargs["json"]))
+        body = {"choices": [{"message": {"content": '["甲", "乙"]'}}], "usage": usage}
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: body)
+
+    monkeypatch.setattr(deepseek_client.requests, "post", fake_post)
+    stats = UsageStats()
+    client = DeepSeekClient(base_url="https://api.deepseek.com/", api_key="key", model="deepseek-chat", stats=stats)
+
+    assert client.translate_batch(["a", "b"], "zh") == ["甲", "乙"]
+    assert [url for url, _ in requests_sent] == ["https://api.deepseek.com/chat/completions"]
+    assert (stats.requests, stats.prompt_tokens, stats.completion_tokens) == (1, 120, 30)
+    assert (stats.cache_hit_tokens, stats.cache_miss_tokens) == (100, 20)
+    assert stats.as_metrics("deepseek_")["deepseek_cache_hit_ratio"] == round(100 / 120, 3)
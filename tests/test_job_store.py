@@ -0,0 +1,287 @@
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+
+from src import job_store
+from src.job_store import SQLiteJobStore, follow_job
+from src.pipeline import PREVIEW_STAGE, STAGES
+
+LEASE = 10.0
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.on_sleep = None
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        if self.on_sleep is not None:
+            self.on_sleep()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(job_store, "time", SimpleNamespace(time=fake.time, sleep=fake.sleep))
+    return fake
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return SQLiteJobStore(str(tmp_path / "jobs.db"), shared_dir=str(tmp_path / "runs"), max_attempts=2)
+
+
+def test_submit_queues_first_stage(store, make_config):
+    job_id = store.submit(make_config(translation_target=["zh", "ja"]))
+    record = store.get(job_id)
+    assert record.state == "queued"
+    assert record.stage == STAGES[0]
+    assert record.config.translation_targets == ["zh", "ja"]
+    assert record.update is not None
+
+
+def test_lease_is_exclusive_until_it_expires(store, clock, make_config):
+    job_id = store.submit(make_config())
+    first = store.lease("a", STAGES, LEASE)
+    assert first.job_id == job_id and first.lease_owner == "a" and first.attempts == 1
+    assert store.lease("b", STAGES, LEASE) is None
+
+    clock.now += LEASE + 1
+    second = store.lease("b", STAGES, LEASE)
+    assert second.job_id == job_id and second.lease_owner == "b" and second.attempts == 2
+    assert not store.heartbeat(job_id, "a", LEASE)
+    assert store.heartbeat(job_id, "b", LEASE)
+
+
+def test_heartbeat_keeps_the_lease(store, clock, make_config):
+    job_id = store.submit(make_config())
+    store.lease("a", STAGES, LEASE)
+    clock.now += LEASE - 1
+    assert store.heartbeat(job_id, "a", LEASE)
+    clock.now += LEASE - 1
+    assert store.lease("b", STAGES, LEASE) is None
+
+
+def test_lease_only_matches_requested_stages(store, make_config):
+    store.submit(make_config())
+    assert store.lease("gpu", ["transcribe"], LEASE) is None
+    assert store.lease("cpu", ["download"], LEASE) is not None
+
+
+def test_job_fails_after_max_attempts(store, clock, make_config):
+    job_id = store.submit(make_config())
+    for worker in ("a", "b"):
+        assert store.lease(worker, STAGES, LEASE) is not None
+        clock.now += LEASE + 1
+
+    assert store.lease("c", STAGES, LEASE) is None
+    record = store.get(job_id)
+    assert record.state == "failed"
+    assert record.lease_owner is None
+    assert "expired" in record.error
+
+
+def test_cancel_while_queued_is_immediate(store, make_config):
+    job_id = store.submit(make_config())
+    store.cancel(job_id)
+    assert store.get(job_id).state == "cancelled"
+    assert store.lease("a", STAGES, LEASE) is None
+
+
+def test_cancel_while_leased_waits_for_the_worker(store, make_config):
+    job_id = store.submit(make_config())
+    leased = store.lease("a", STAGES, LEASE)
+    store.cancel(job_id)
+
+    record = store.get(job_id)
+    assert record.state == "leased" and record.cancel_requested
+    assert not store.heartbeat(job_id, "a", LEASE)
+
+    store.complete_stage(job_id, "a", leased.update)
+    assert store.get(job_id).state == "cancelled"
+
+
+def test_cancel_after_lease_expired_is_immediate(store, clock, make_config):
+    job_id = store.submit(make_config())
+    store.lease("a", STAGES, LEASE)
+    clock.now += LEASE + 1
+    store.cancel(job_id)
+    assert store.get(job_id).state == "cancelled"
+
+
+def test_complete_stage_advances_through_every_stage(store, make_config):
+    job_id = store.submit(make_config())
+    for stage in STAGES:
+        leased = store.lease("a", STAGES, LEASE)
+        assert leased.stage == stage
+        store.complete_stage(job_id, "a", replace(leased.update, status_markdown=f"{stage} done"))
+
+    record = store.get(job_id)
+    assert record.state == "succeeded"
+    assert record.update.status_markdown == f"{STAGES[-1]} done"
+
+
+def test_complete_stage_ignores_stale_owner(store, clock, make_config):
+    job_id = store.submit(make_config())
+    stale = store.lease("a", STAGES, LEASE)
+    clock.now += LEASE + 1
+    store.lease("b", STAGES, LEASE)
+
+    store.complete_stage(job_id, "a", replace(stale.update, status_markdown="stale"))
+    record = store.get(job_id)
+    assert record.stage == STAGES[0]
+    assert record.lease_owner == "b"
+    assert record.update.status_markdown != "stale"
+
+    store.fail(job_id, "a", "stale failure")
+    assert store.get(job_id).state == "leased"
+
+
+def test_follow_job_yields_updates_until_success(store, clock, make_config):
+    job_id = store.submit(make_config())
+
+    def run_next_stage() -> None:
+        leased = store.lease("a", STAGES, LEASE)
+        store.complete_stage(job_id, "a", replace(leased.update, status_markdown=f"{leased.stage} done"))
+
+    clock.on_sleep = run_next_stage
+    statuses = [update.status_markdown for update in follow_job(store, job_id)]
+    assert statuses == ["**Queued...**"] + [f"{stage} done" for stage in STAGES]
+    assert store.get(job_id).state == "succeeded"
+
+
+def test_follow_job_stops_when_cancelled(store, make_config):
+    job_id = store.submit(make_config())
+    store.cancel(job_id)
+    assert len(list(follow_job(store, job_id))) == 1
+
+
+def test_follow_job_raises_on_failure(store, make_config):
+    job_id = store.submit(make_config())
+    store.lease("a", STAGES, LEASE)
+    store.fail(job_id, "a", "transcribe: out of memory")
+    with pytest.raises(RuntimeError, match="out of memory"):
+        list(follow_job(store, job_id))
+
+
+def test_follow_job_raises_for_unknown_job(store):
+    with pytest.raises(RuntimeError):
+        list(follow_job(store, "missing"))
+
+
+def test_release_requeues_the_stage(store, make_config):
+    job_id = store.submit(make_config())
+    store.lease("a", STAGES, LEASE)
+    store.release(job_id, "a")
+
+    record = store.get(job_id)
+    assert record.state == "queued" and record.lease_owner is None
+    assert store.lease("b", STAGES, LEASE).attempts == 2
+
+
+def test_release_after_cancel_marks_cancelled(store, make_config):
+    job_id = store.submit(make_config())
+    store.lease("a", STAGES, LEASE)
+    store.cancel(job_id)
+    store.release(job_id, "a")
+    assert store.get(job_id).state == "cancelled"
+
+
+def test_release_ignores_stale_owner(store, clock, make_config):
+    job_id = store.submit(make_config())
+    store.lease("a", STAGES, LEASE)
+    clock.now += LEASE + 1
+    store.lease("b", STAGES, LEASE)
+    store.release(job_id, "a")
+    assert store.get(job_id).lease_owner == "b"
+
+
+@pytest.mark.parametrize("targets", ["", [], ["", None]])
+def test_submit_rejects_missing_targets(store, targets, make_config):
+    with pytest.raises(ValueError, match="translation target"):
+        store.submit(make_config(translation_target=targets))
+    assert store.list() == []
+
+
+def test_submit_rejects_missing_source(store, make_config):
+    with pytest.raises(ValueError, match="URL or a local video"):
+        store.submit(make_config(url=None))
+
+
+def test_download_queues_a_preview_task_when_requested(store, make_config):
+    job_id = store.submit(make_config(preview_proxy=True))
+    leased = store.lease("a", ["download"], LEASE)
+    store.complete_stage(job_id, "a", leased.update)
+
+    assert store.get(job_id).stage == "transcribe"
+    assert [r.job_id for r in store.list()] == [job_id]
+
+    preview = store.lease("b", [PREVIEW_STAGE], LEASE)
+    assert preview.parent_id == job_id
+    assert preview.workspace_dir == leased.workspace_dir
+    store.complete_stage(preview.job_id, "b", replace(preview.update, preview_path="/runs/x/preview.mp4"))
+    assert store.get(preview.job_id).state == "succeeded"
+    assert store.get(job_id).state == "queued"
+    assert store.get(job_id).update.preview_path == "/runs/x/preview.mp4"
+
+    # Later stages keep the preview even if their update was built before it existed
+    leased = store.lease("a", ["transcribe"], LEASE)
+    store.complete_stage(job_id, "a", replace(leased.update, preview_path=None))
+    assert store.get(job_id).update.preview_path == "/runs/x/preview.mp4"
+
+
+def test_follow_job_waits_for_the_preview_task(store, clock, make_config):
+    job_id = store.submit(make_config(preview_proxy=True))
+    for stage in STAGES:
+        leased = store.lease("a", [stage], LEASE)
+        store.complete_stage(job_id, "a", replace(leased.update, status_markdown=f"{stage} done"))
+    assert store.get(job_id).state == "succeeded"
+
+    def run_preview() -> None:
+        preview = store.lease("b", [PREVIEW_STAGE], LEASE)
+        store.complete_stage(preview.job_id, "b", replace(preview.update, preview_path="/runs/x/preview.mp4"))
+
+    clock.on_sleep = run_preview
+    updates = list(follow_job(store, job_id))
+    assert updates[-1].status_markdown == "translate done"
+    assert updates[-1].preview_path == "/runs/x/preview.mp4"
+
+
+def test_no_preview_task_without_preview_proxy(store, make_config):
+    job_id = store.submit(make_config())
+    store.complete_stage(job_id, "a", store.lease("a", ["download"], LEASE).update)
+    assert store.lease("b", [PREVIEW_STAGE], LEASE) is None
+
+
+def test_cancel_reaches_the_preview_task(store, make_config):
+    job_id = store.submit(make_config(preview_proxy=True))
+    store.complete_stage(job_id, "a", store.lease("a", ["download"], LEASE).update)
+    preview = store.lease("b", [PREVIEW_STAGE], LEASE)
+
+    store.cancel(job_id)
+    assert store.get(job_id).state == "cancelled"
+    assert not store.heartbeat(preview.job_id, "b", LEASE)
+
+
+def test_cancel_then_worker_crash_is_finalised_by_the_next_lease(store, clock, make_config):
+    job_id = store.submit(make_config())
+    store.lease("a", STAGES, LEASE)
+    store.cancel(job_id)
+    assert store.get(job_id).state == "leased"
+
+    # Worker "a" dies without releasing; any worker's next poll finalises the job
+    clock.now += LEASE + 1
+    assert store.lease("b", ["translate"], LEASE) is None
+    assert store.get(job_id).state == "cancelled"
+    assert len(list(follow_job(store, job_id))) == 1
+
+
+def test_api_key_is_not_stored(store, tmp_path, make_config):
+    job_id = store.submit(make_config(deepseek_api_key="secret-key"))
+    assert store.get(job_id).config.deepseek_api_key == ""
+    assert b"secret-key" not in (tmp_path / "jobs.db").read_bytes()
@@ -0,0 +1,169 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import jobs
+from src.api import create_api
+from src.jobs import JobManager
+from src.pipeline import JobCancelled, JobUpdate
+
+TIMEOUT = 5.0
+
+
+def make_update(status: str) -> JobUpdate:
+    return JobUpdate(
+        status_markdown=status,
+        video_path=None,
+        original_vtt_path=None,
+        translated_vtt_path=None,
+        bilingual_vtt_path=None,
+        original_srt_path=None,
+        translated_srt_path=None,
+        bilingual_srt_path=None,
+        workspace_dir="/runs/x",
+    )
+
+
+class FakePipeline:
+    """Stands in for run_job: one update per stage, then waits for `gate`."""
+
+    def __init__(self, stages=("download", "transcribe", "translate"), gated=False) -> None:
+        self.stages = stages
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        if not gated:
+            self.gate.set()
+
+    def __call__(self, cfg, cancel_event=None):
+        for stage in self.stages:
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled()
+            yield make_update(f"{stage} done")
+            self.started.set()
+            self.gate.wait(TIMEOUT)
+
+
+@pytest.fixture
+def manager():
+    return JobManager(max_workers=1)
+
+
+@pytest.fixture
+def client(manager):
+    with TestClient(create_api(manager=manager)) as client:
+        yield client
+
+
+def submit(client) -> str:
+    response = client.post("/api/jobs", json={"url": "https://example.com/video"})
+    assert response.status_code == 202
+    return response.json()["job_id"]
+
+
+def wait_finished(manager, job_id: str) -> None:
+    manager.get(job_id).future.result(timeout=TIMEOUT)
+
+
+def test_job_runs_to_success(client, manager, monkeypatch):
+    monkeypatch.setattr(jobs, "run_job", FakePipeline())
+    job_id = submit(client)
+    wait_finished(manager, job_id)
+
+    job = client.get(f"/api/jobs/{job_id}").json()
+    assert job["state"] == "succeeded"
+    assert job["update_count"] == 3 and job["latest"]["status_markdown"] == "translate done"
+
+
+def test_failed_stage_fails_the_job(client, manager, monkeypatch):
+    def broken(cfg, cancel_event=None):
+        yield make_update("download done")
+        raise RuntimeError("transcribe: out of memory")
+
+    monkeypatch.setattr(jobs, "run_job", broken)
+    job_id = submit(client)
+    wait_finished(manager, job_id)
+
+    job = client.get(f"/api/jobs/{job_id}").json()
+    assert job["state"] == "failed" and "out of memory" in job["error"]
+
+
+def test_cancel_drops_a_queued_job(client, manager, monkeypatch):
+    pipeline = FakePipeline(gated=True)
+    monkeypatch.setattr(jobs, "run_job", pipeline)
+    running = submit(client)
+    assert pipeline.started.wait(TIMEOUT)
+    queued = submit(client)
+
+    assert client.post(f"/api/jobs/{queued}/cancel").json()["state"] == "cancelled"
+    assert manager.get(queued).updates == []
+
+    pipeline.gate.set()
+    wait_finished(manager, running)
+    assert manager.get(running).state is jobs.JobState.SUCCEEDED
+
+
+def test_cancel_stops_a_running_job_at_the_next_stage(client, manager, monkeypatch):
+    pipeline = FakePipeline(gated=True)
+    monkeypatch.setattr(jobs, "run_job", pipeline)
+    job_id = submit(client)
+    assert pipeline.started.wait(TIMEOUT)
+
+    # The current stage is left to finish; JobCancelled is raised before the next
+    assert client.post(f"/api/jobs/{job_id}/cancel").json()["state"] == "running"
+    pipeline.gate.set()
+    wait_finished(manager, job_id)
+
+    job = client.get(f"/api/jobs/{job_id}").json()
+    assert job["state"] == "cancelled" and job["update_count"] == 1
+    assert client.post(f"/api/jobs/{job_id}/cancel").json()["state"] == "cancelled"
+
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if not line.startswith(":"))
+        events.append((fields.get("id"), fields["event"]))
+    return events
+
+
+def test_event_stream_resumes_after_last_event_id(client, manager, monkeypatch):
+    monkeypatch.setattr(jobs, "run_job", FakePipeline())
+    job_id = submit(client)
+    wait_finished(manager, job_id)
+
+    with client.stream("GET", f"/api/jobs/{job_id}/events") as response:
+        assert parse_events("".join(response.iter_text())) == [
+            ("0", "update"),
+            ("1", "update"),
+            ("2", "update"),
+            (None, "end"),
+        ]
+
+    with client.stream("GET", f"/api/jobs/{job_id}/events", headers={"Last-Event-ID": "1"}) as response:
+        assert parse_events("".join(response.iter_text())) == [("2", "update"), (None, "end")]
+
+
+def test_finished_jobs_are_evicted_after_retention(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(jobs, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    monkeypatch.setattr(jobs, "run_job", FakePipeline())
+    manager = JobManager(retention_seconds=60.0)
+
+    with TestClient(create_api(manager=manager)) as client:
+        job_id = submit(client)
+        wait_finished(manager, job_id)
+        # Kept until retention_seconds after it finished
+        now[0] += 59.0
+        assert client.get(f"/api/jobs/{job_id}").status_code == 200
+
+        now[0] += 2.0
+        assert client.get(f"/api/jobs/{job_id}").status_code == 404
+        assert client.get("/api/jobs").json() == {"jobs": []}
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/jobs/missing").status_code == 404
+    assert client.post("/api/jobs/missing/cancel").status_code == 404
+    assert client.get("/api/jobs/missing/events").status_code == 404
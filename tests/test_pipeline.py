@@ -0,0 +1,187 @@
+import threading
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from src import pipeline
+from src.pipeline import LANGUAGE_DETECTION_SECONDS, LANGUAGE_SKIP_MIN_PROBABILITY
+from src.subtitles import SubtitleSegment
+from src.vad_cache import SAMPLING_RATE
+
+SEGMENTS = [SubtitleSegment(0.0, 1.0, "hello"), SubtitleSegment(1.0, 2.0, "world")]
+
+
+def fake_translate(target, stats):
+    return [replace(seg, text=f"{target}:{seg.text}") for seg in SEGMENTS]
+
+
+def test_confident_source_language_is_not_translated(make_config):
+    translations, metrics = pipeline._translate_all(
+        make_config(translation_target=["en", "zh"]), SEGMENTS, ("en", LANGUAGE_SKIP_MIN_PROBABILITY), translate=fake_translate
+    )
+    assert translations["en"] == SEGMENTS
+    assert translations["zh"][0].text == "zh:hello"
+    assert metrics["translate_en_skipped"] == 1.0
+    assert "translate_zh_skipped" not in metrics
+
+
+def test_uncertain_source_language_is_still_translated(make_config):
+    translations, metrics = pipeline._translate_all(
+        make_config(translation_target=["en", "zh"]), SEGMENTS, ("en", LANGUAGE_SKIP_MIN_PROBABILITY - 0.01), translate=fake_translate
+    )
+    assert translations["en"][0].text == "en:hello"
+    assert "translate_en_skipped" not in metrics
+
+
+def test_only_an_exact_language_match_is_skipped(make_config):
+    cfg = make_config(translation_target=["ZH", "zh-TW", "pt-BR"])
+    translations, metrics = pipeline._translate_all(cfg, SEGMENTS, ("zh", 0.99), translate=fake_translate)
+    assert translations["ZH"] == SEGMENTS and metrics["translate_ZH_skipped"] == 1.0
+    assert translations["zh-TW"][0].text == "zh-TW:hello"
+    assert translations["pt-BR"][0].text == "pt-BR:hello"
+    assert "translate_zh-TW_skipped" not in metrics
+
+
+def test_language_is_detected_on_the_speech_head_and_cached(workspace, make_config, fake_model):
+    speech = np.arange(SAMPLING_RATE * (LANGUAGE_DETECTION_SECONDS + 10), dtype=np.float32)
+    model = fake_model
+    model.probability = 0.42
+
+    assert pipeline._resolve_language(make_config(), model, workspace, speech) == "en"
+    (audio,) = model.detected_on
+    assert np.array_equal(audio, speech[: LANGUAGE_DETECTION_SECONDS * SAMPLING_RATE])
+    assert workspace.read_language() == ("en", 0.42)
+
+    assert pipeline._resolve_language(make_config(), model, workspace, speech) == "en"
+    assert len(model.detected_on) == 1
+
+
+def test_configured_language_skips_detection(workspace, make_config, fake_model):
+    model = fake_model
+    cfg = make_config(transcription_language="ja")
+    assert pipeline._resolve_language(cfg, model, workspace, np.zeros(16000, dtype=np.float32)) == "ja"
+    assert model.detected_on == []
+    assert workspace.read_language() == ("ja", 1.0)
+
+
+def test_failed_retranslation_keeps_the_previous_transcript(workspace, tmp_path, monkeypatch, make_config):
+    pipeline._write_original(workspace, SEGMENTS)
+    pipeline._write_translations(workspace, "zh", SEGMENTS, [replace(s, text="zh") for s in SEGMENTS])
+    edited_path = tmp_path / "edited.srt"
+    pipeline.write_srt(edited_path, [SEGMENTS[0], replace(SEGMENTS[1], text="edited")])
+
+    def failing_translate(*args, **kwargs):
+        raise RuntimeError("API down")
+
+    monkeypatch.setattr(pipeline, "_translate_segments", failing_translate)
+    with pytest.raises(RuntimeError, match="API down"):
+        list(pipeline.run_retranslation(make_config(translation_target="zh"), workspace, str(edited_path)))
+
+    assert [s.text for s in pipeline.load_segments(workspace.transcript_path)] == ["hello", "world"]
+
+
+def cues(*texts):
+    return [SubtitleSegment(float(i), float(i) + 1, text) for i, text in enumerate(texts)]
+
+
+PREVIOUS = cues("a", "b", "c", "d", "e")
+
+
+def test_plan_unchanged_transcript_reuses_everything():
+    reuse, changed = pipeline._plan_retranslation(PREVIOUS, cues("a", "b", "c", "d", "e"), context=2)
+    assert reuse == {i: i for i in range(5)}
+    assert changed == []
+
+
+def test_plan_ignores_whitespace_only_edits():
+    reuse, changed = pipeline._plan_retranslation(PREVIOUS, cues("a", " b ", "c", "d", "e"), context=1)
+    assert changed == []
+
+
+def test_plan_replace_with_context():
+    reuse, changed = pipeline._plan_retranslation(PREVIOUS, cues("a", "b", "X", "d", "e"), context=1)
+    assert changed == [1, 2, 3]
+    assert reuse == {0: 0, 1: 1, 3: 3, 4: 4}
+
+
+def test_plan_insert_with_context():
+    reuse, changed = pipeline._plan_retranslation(PREVIOUS, cues("a", "b", "new", "c", "d", "e"), context=1)
+    assert changed == [1, 2, 3]
+    assert reuse == {0: 0, 1: 1, 3: 2, 4: 3, 5: 4}
+
+
+def test_plan_delete_retranslates_the_neighbours():
+    reuse, changed = pipeline._plan_retranslation(PREVIOUS, cues("a", "b", "d", "e"), context=1)
+    assert changed == [1, 2]
+    assert reuse == {0: 0, 1: 1, 2: 3, 3: 4}
+
+    _, changed = pipeline._plan_retranslation(PREVIOUS, cues("a", "b", "d", "e"), context=0)
+    assert changed == []
+
+
+def test_plan_context_is_clamped_at_the_edges():
+    _, changed = pipeline._plan_retranslation(PREVIOUS, cues("A", "b", "c", "d", "E"), context=2)
+    assert changed == [0, 1, 2, 3, 4]
+    _, changed = pipeline._plan_retranslation(PREVIOUS, cues("A", "b", "c", "d", "e"), context=2)
+    assert changed == [0, 1, 2]
+
+
+class RecordingClient:
+    calls = []
+
+    def __init__(self, **kwargs) -> None:
+        pass
+
+    def translate_batch(self, texts, target_language, context=None):
+        RecordingClient.calls.append((list(texts), list(context or [])))
+        return [f"new {t}" for t in texts]
+
+
+def test_retranslation_sends_previous_translations_as_context(workspace, tmp_path, monkeypatch, make_config):
+    previous = cues("a", "b", "c", "d", "e", "f", "g")
+    pipeline._write_original(workspace, previous)
+    pipeline._write_translations(workspace, "zh", previous, [replace(s, text=f"old {s.text}") for s in previous])
+    edited_path = tmp_path / "edited.srt"
+    pipeline.write_srt(edited_path, cues("a", "B", "c", "d", "e", "F", "g"))
+
+    RecordingClient.calls = []
+    monkeypatch.setattr(pipeline, "DeepSeekClient", RecordingClient)
+    list(pipeline.run_retranslation(make_config(translation_target="zh"), workspace, str(edited_path), context=0))
+
+    assert RecordingClient.calls == [
+        (["B"], [("a", "old a")]),
+        (["F"], [("c", "old c"), ("d", "old d"), ("e", "old e")]),
+    ]
+    translated = pipeline.load_segments(workspace.translated_path("zh", ".json"))
+    assert [s.text for s in translated] == ["old a", "new B", "old c", "old d", "old e", "new F", "old g"]
+
+
+def test_batches_continue_from_the_given_context(monkeypatch, make_config):
+    RecordingClient.calls = []
+    monkeypatch.setattr(pipeline, "DeepSeekClient", RecordingClient)
+    segments = cues(*[f"line {i}" for i in range(22)])
+
+    pipeline._translate_segments(make_config(), segments, "zh", context=[("before", "earlier")])
+
+    (first_batch, first_context), (second_batch, second_context) = RecordingClient.calls
+    assert len(first_batch) == 20 and first_context == [("before", "earlier")]
+    assert second_batch == ["line 20", "line 21"]
+    assert second_context == [(f"line {i}", f"new line {i}") for i in (17, 18, 19)]
+
+
+def test_translation_stops_between_batches_when_cancelled(monkeypatch, make_config):
+    cancel_event = threading.Event()
+
+    class CancellingClient(RecordingClient):
+        def translate_batch(self, texts, target_language, context=None):
+            cancel_event.set()
+            return super().translate_batch(texts, target_language, context)
+
+    RecordingClient.calls = []
+    monkeypatch.setattr(pipeline, "DeepSeekClient", CancellingClient)
+    segments = cues(*[f"line {i}" for i in range(45)])
+
+    with pytest.raises(pipeline.JobCancelled):
+        pipeline._translate_all(make_config(translation_target="zh"), segments, cancel_event=cancel_event)
+    assert len(RecordingClient.calls) == 1
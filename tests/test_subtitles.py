@@ -0,0 +1,67 @@
+import pytest
+
+from src.subtitles import SubtitleSegment, parse_subtitles, read_subtitles, write_srt, write_vtt
+
+SEGMENTS = [
+    SubtitleSegment(start=0.0, end=1.5, text="Hello there."),
+    SubtitleSegment(start=2.01, end=4.35, text="Timestamps that are not exact in binary."),
+    SubtitleSegment(start=3725.125, end=3728.9, text="Over an hour in, with ümlauts and 中文."),
+    SubtitleSegment(start=3730.0, end=3735.0, text=" ".join(["a long cue that gets wrapped"] * 6)),
+]
+
+
+@pytest.mark.parametrize("write", [write_srt, write_vtt])
+def test_round_trip(tmp_path, write):
+    path = tmp_path / "subs.txt"
+    write(path, SEGMENTS)
+    assert read_subtitles(path) == SEGMENTS
+
+
+def test_wrapped_lines_are_joined(tmp_path):
+    path = tmp_path / "subs.srt"
+    write_srt(path, SEGMENTS[3:])
+    assert "\n" in path.read_text(encoding="utf-8").split("\n", 2)[2].strip()
+    assert read_subtitles(path)[0].text == SEGMENTS[3].text
+
+
+def test_vtt_cue_settings_identifiers_and_notes_are_ignored():
+    content = (
+        "WEBVTT - with a title\n"
+        "\n"
+        "NOTE this block has no timing\n"
+        "\n"
+        "STYLE\n"
+        "::cue { color: yellow }\n"
+        "\n"
+        "intro\n"
+        "00:01.000 --> 00:02.500 align:start position:10%\n"
+        "First line\n"
+        "second line\n"
+        "\n"
+        "00:00:03.000 --> 00:00:04.000\tline:0\n"
+        "Tab before settings\n"
+    )
+    assert parse_subtitles(content) == [
+        SubtitleSegment(start=1.0, end=2.5, text="First line second line"),
+        SubtitleSegment(start=3.0, end=4.0, text="Tab before settings"),
+    ]
+
+
+def test_bom_and_crlf_input(tmp_path):
+    content = "\ufeff1\r\n00:00:01,000 --> 00:00:02,000\r\nWindows line\r\n\r\n2\r\n00:00:03,000 --> 00:00:04,000\r\nSecond\r\n"
+    expected = [SubtitleSegment(1.0, 2.0, "Windows line"), SubtitleSegment(3.0, 4.0, "Second")]
+    assert parse_subtitles(content) == expected
+
+    path = tmp_path / "windows.srt"
+    path.write_bytes(content.encode("utf-8"))
+    assert read_subtitles(path) == expected
+
+
+def test_extra_blank_lines_and_missing_trailing_newline():
+    content = "\n\n1\n00:00:01,000 --> 00:00:02,000\nOne\n\n\n\n2\n00:00:03,000 --> 00:00:04,000\nTwo"
+    assert [s.text for s in parse_subtitles(content)] == ["One", "Two"]
+
+
+def test_invalid_timestamp_is_rejected():
+    with pytest.raises(ValueError, match="Invalid subtitle timestamp"):
+        parse_subtitles("1\n00:00:01 --> 00:00:02,000\nNo milliseconds\n")
@@ -0,0 +1,100 @@
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from faster_whisper.transcribe import restore_speech_timestamps
+
+from src import pipeline, vad_cache
+from src.vad_cache import SAMPLING_RATE, collect_speech, load_speech_map
+
+SPEECH = [{"start": 16000, "end": 48000}, {"start": 80000, "end": 96000}]
+
+
+@pytest.fixture
+def vad_calls(monkeypatch):
+    calls = []
+
+    def fake_vad(audio, vad_options=None, sampling_rate=16000, **kwargs):
+        calls.append(len(audio))
+        return [dict(chunk) for chunk in SPEECH]
+
+    monkeypatch.setattr(vad_cache, "get_speech_timestamps", fake_vad)
+    return calls
+
+
+def test_speech_map_is_cached_by_audio_content(workspace, vad_calls):
+    audio = np.zeros(SAMPLING_RATE * 8, dtype=np.float32)
+    speech_map, _, cache_hit = load_speech_map(audio, workspace.audio_path, workspace.vad_cache_dir)
+    assert speech_map == SPEECH and not cache_hit
+
+    speech_map, _, cache_hit = load_speech_map(audio, workspace.audio_path, workspace.vad_cache_dir)
+    assert speech_map == SPEECH and cache_hit
+    assert len(vad_calls) == 1
+
+    workspace.audio_path.write_bytes(b"RIFF other audio")
+    load_speech_map(audio, workspace.audio_path, workspace.vad_cache_dir)
+    assert len(vad_calls) == 2
+
+
+def test_cache_write_leaves_no_temp_files(workspace, vad_calls):
+    audio = np.zeros(SAMPLING_RATE * 8, dtype=np.float32)
+    # A temp file left by another writer must not be reused or clobbered
+    workspace.vad_cache_dir.mkdir(parents=True, exist_ok=True)
+    stale = workspace.vad_cache_dir / "other-writer.partial"
+    stale.write_text("in progress", encoding="utf-8")
+
+    load_speech_map(audio, workspace.audio_path, workspace.vad_cache_dir)
+    assert sorted(p.name for p in workspace.vad_cache_dir.iterdir()) == sorted(
+        [stale.name, next(workspace.vad_cache_dir.glob("*.json")).name]
+    )
+    assert stale.read_text(encoding="utf-8") == "in progress"
+
+
+def test_unreadable_cache_entry_is_recomputed(workspace, vad_calls):
+    audio = np.zeros(SAMPLING_RATE * 8, dtype=np.float32)
+    load_speech_map(audio, workspace.audio_path, workspace.vad_cache_dir)
+    (cache_file,) = workspace.vad_cache_dir.glob("*.json")
+    cache_file.write_text('{"speech": [[1.0, 3.0]], "vad_seconds": 0.5}', encoding="utf-8")
+
+    speech_map, _, cache_hit = load_speech_map(audio, workspace.audio_path, workspace.vad_cache_dir)
+    assert speech_map == SPEECH and not cache_hit
+
+
+def test_collect_speech_concatenates_regions():
+    audio = np.arange(SAMPLING_RATE * 8, dtype=np.float32)
+    speech = collect_speech(audio, SPEECH)
+    assert np.array_equal(speech, np.concatenate([audio[16000:48000], audio[80000:96000]]))
+
+
+def test_transcribe_restores_timestamps_like_vad_filter(workspace, vad_calls, fake_model, make_config, monkeypatch):
+    audio = np.arange(SAMPLING_RATE * 8, dtype=np.float32)
+    monkeypatch.setattr(pipeline, "decode_audio", lambda *args, **kwargs: audio)
+
+    segments = pipeline._transcribe(make_config(transcription_language="en"), workspace)
+
+    ((model_audio, kwargs),) = fake_model.calls
+    assert kwargs["vad_filter"] is False and "clip_timestamps" not in kwargs
+    assert np.array_equal(model_audio, collect_speech(audio, SPEECH))
+
+    fake_segments = (SimpleNamespace(start=s, end=e, text=t, words=None) for s, e, t in fake_model.SEGMENTS)
+    expected = [(s.start, s.end) for s in restore_speech_timestamps(fake_segments, SPEECH, SAMPLING_RATE)]
+    assert [(s.start, s.end) for s in segments] == expected
+    assert [s.text for s in segments] == ["first", "second", "third"]
+    assert expected[0] == (1.0, 2.5) and expected[1] == (2.5, 3.0)
+
+
+def test_transcribe_stops_between_segments_when_cancelled(workspace, vad_calls, fake_model, make_config, monkeypatch):
+    cancel_event = threading.Event()
+    decoded = []
+
+    def on_segment(text):
+        decoded.append(text)
+        cancel_event.set()
+
+    fake_model.on_segment = on_segment
+    monkeypatch.setattr(pipeline, "decode_audio", lambda *args, **kwargs: np.zeros(SAMPLING_RATE * 8, np.float32))
+
+    with pytest.raises(pipeline.JobCancelled):
+        pipeline._transcribe(make_config(transcription_language="en"), workspace, cancel_event)
+    assert decoded == ["first"]
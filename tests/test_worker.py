@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from src import worker
+from src.job_store import SQLiteJobStore
+from src.worker import Worker
+
+LEASE = 0.6
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / "jobs.db"), shared_dir=str(tmp_path / "runs"))
+
+
+@pytest.fixture
+def stub_stage(monkeypatch):
+    # Forked stage processes inherit the stubbed run_stage; spawned ones would not
+    monkeypatch.setattr(worker, "START_METHOD", "fork")
+
+    def install(run_stage) -> None:
+        monkeypatch.setattr(worker, "run_stage", run_stage)
+
+    return install
+
+
+def test_completed_stage_advances_the_job(store, stub_stage, make_config):
+    job_id = store.submit(make_config())
+    queued = store.get(job_id).update
+    stub_stage(lambda stage, cfg, workspace: replace(queued, status_markdown=f"{stage} done"))
+
+    assert Worker(store, stages=["download"], lease_seconds=LEASE).run_once()
+    record = store.get(job_id)
+    assert record.state == "queued" and record.stage == "transcribe"
+    assert record.update.status_markdown == "download done"
+    assert not Worker(store, stages=["download"], lease_seconds=LEASE).run_once()
+
+
+def test_stage_exception_fails_the_job(store, stub_stage, make_config):
+    def broken(stage, cfg, workspace):
+        raise RuntimeError("out of memory")
+
+    stub_stage(broken)
+    job_id = store.submit(make_config())
+    Worker(store, lease_seconds=LEASE).run_once()
+
+    record = store.get(job_id)
+    assert record.state == "failed" and record.error == "download: out of memory"
+
+
+def test_stage_process_crash_fails_the_job(store, stub_stage, make_config):
+    stub_stage(lambda stage, cfg, workspace: os._exit(3))
+    job_id = store.submit(make_config())
+    Worker(store, lease_seconds=LEASE).run_once()
+
+    record = store.get(job_id)
+    assert record.state == "failed" and "exited with code 3" in record.error
+
+
+def _hanging_stage(stage, cfg, workspace):
+    (workspace.root / "stage.pid").write_text(str(os.getpid()), encoding="utf-8")
+    time.sleep(60)
+
+
+def _assert_killed(workspace_dir: str) -> None:
+    pid = int((Path(workspace_dir) / "stage.pid").read_text(encoding="utf-8"))
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+
+
+def test_cancel_kills_the_stage_and_finalises_the_job(store, stub_stage, make_config):
+    stub_stage(_hanging_stage)
+    job_id = store.submit(make_config())
+    started = Path(store.get(job_id).workspace_dir) / "stage.pid"
+
+    def cancel_once_started() -> None:
+        while not started.exists():
+            time.sleep(0.05)
+        store.cancel(job_id)
+
+    threading.Thread(target=cancel_once_started, daemon=True).start()
+
+    start = time.monotonic()
+    Worker(store, lease_seconds=LEASE).run_once()
+    assert time.monotonic() - start < 10
+
+    record = store.get(job_id)
+    assert record.state == "cancelled" and record.lease_owner is None
+    _assert_killed(record.workspace_dir)
+
+
+def test_lost_lease_kills_the_stage_and_releases_it(store, stub_stage, monkeypatch, make_config):
+    stub_stage(_hanging_stage)
+    job_id = store.submit(make_config())
+    started = Path(store.get(job_id).workspace_dir) / "stage.pid"
+    # Another worker takes the lease over once the stage is running
+    monkeypatch.setattr(store, "heartbeat", lambda *args: not started.exists())
+
+    Worker(store, worker_id="a", lease_seconds=LEASE).run_once()
+
+    record = store.get(job_id)
+    assert record.state == "queued" and record.lease_owner is None and record.stage == "download"
+    _assert_killed(record.workspace_dir)
+
+
+def test_worker_key_is_only_sent_to_its_own_endpoint(monkeypatch, make_config):
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "worker-key")
+    monkeypatch.delenv("DEEPSEEK_BASE_URL", raising=False)
+
+    assert worker._with_worker_credentials(make_config()).deepseek_api_key == "worker-key"
+    other = make_config(deepseek_base_url="https://llm.example.com")
+    assert worker._with_worker_credentials(other).deepseek_api_key == ""
@@ -0,0 +1,12 @@
+from src.workspace import create_workspace
+
+
+def test_scoped_metrics_are_merged_on_read(tmp_path):
+    workspace = create_workspace(str(tmp_path))
+    workspace.record_metrics({"download_seconds": 1.0})
+    workspace.record_metrics({"preview_proxy_seconds": 4.0}, scope="preview")
+    workspace.record_metrics({"transcribe_seconds": 2.0})
+
+    assert workspace.read_metrics() == {"download_seconds": 1.0, "transcribe_seconds": 2.0, "preview_proxy_seconds": 4.0}
+    assert "preview_proxy_seconds" not in workspace.metrics_path.read_text(encoding="utf-8")
+    assert [p.name for p in sorted(workspace.root.iterdir())] == ["metrics.json", "metrics.preview.json"]